@@ -0,0 +1,163 @@
+"""
+Score many family files in one process pool and write a consolidated result file.
+"""
+
+import argparse
+import csv
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from heredity import compute_probabilities, inheritance, load_data
+from session import Session
+
+
+def session_probabilities(people):
+    """
+    Compute every distribution with a freshly compiled `Session`.
+    """
+
+    return Session(people).probabilities()
+
+
+ENGINES = {
+    'session': session_probabilities,
+    'enumerate': compute_probabilities
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compute gene and trait probabilities for many family files.")
+
+    parser.add_argument("source", help="directory of family CSV files, or a manifest listing one file per line")
+    parser.add_argument("output", help="result file, written as JSON or CSV depending on its extension")
+    parser.add_argument("--workers", type=int, default=None, help="number of worker processes")
+    parser.add_argument("--engine", choices=sorted(ENGINES), default='session', help="inference engine")
+
+    args = parser.parse_args()
+
+    filenames = find_families(args.source)
+
+    start = time.perf_counter()
+
+    results = score_families(filenames, engine=args.engine, workers=args.workers)
+
+    elapsed = time.perf_counter() - start
+
+    if args.output.endswith(".csv"):
+        write_csv(args.output, results)
+    else:
+        write_json(args.output, results)
+
+    failed = sum(result['error'] is not None for result in results)
+
+    print(f"Scored {len(results) - failed} families ({failed} failed) in {elapsed:.2f}s.")
+
+
+def find_families(source):
+    """
+    Return the family files in directory `source`, or the files listed in manifest `source`.
+    """
+
+    if os.path.isdir(source):
+        return sorted(
+            os.path.join(source, filename) for filename in os.listdir(source) if filename.endswith(".csv")
+        )
+
+    directory = os.path.dirname(source)
+
+    with open(source) as f:
+        return [os.path.join(directory, line.strip()) for line in f if line.strip()]
+
+
+def initialize():
+    """
+    Build the inheritance table once per worker so that every family reuses it.
+    """
+
+    for mother in range(3):
+        for father in range(3):
+            inheritance(mother, father)
+
+
+def score(filename, engine):
+    """
+    Load and score a single family file, timing the inference.
+    """
+
+    start = time.perf_counter()
+
+    try:
+        people = load_data(filename)
+
+        probabilities = ENGINES[engine](people)
+        error = None
+    except Exception as e:
+        probabilities = dict()
+        error = f"{type(e).__name__}: {e}"
+
+    return {
+        'family': filename,
+        'seconds': time.perf_counter() - start,
+        'error': error,
+        'probabilities': probabilities
+    }
+
+
+def score_families(filenames, engine='session', workers=None):
+    """
+    Score every family in `filenames` across a pool of `workers` processes, keeping their order.
+    """
+
+    chunksize = max(1, len(filenames) // (4 * (workers or os.cpu_count() or 1)))
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=initialize) as executor:
+        return list(executor.map(score, filenames, [engine] * len(filenames), chunksize=chunksize))
+
+
+def write_json(filename, results):
+    """
+    Write `results` as a JSON list with one entry per family.
+    """
+
+    with open(filename, "w") as f:
+        json.dump([
+            {
+                'family': result['family'],
+                'seconds': result['seconds'],
+                'error': result['error'],
+                'people': {
+                    person: {
+                        'gene': {str(value): p for value, p in distribution['gene'].items()},
+                        'trait': distribution['trait'][True]
+                    } for person, distribution in result['probabilities'].items()
+                }
+            } for result in results
+        ], f, indent=2)
+
+
+def write_csv(filename, results):
+    """
+    Write `results` as a CSV file with one row per person, repeating each family's timing.
+    """
+
+    with open(filename, "w", newline="") as f:
+        writer = csv.writer(f)
+
+        writer.writerow(["family", "seconds", "error", "person", "gene_2", "gene_1", "gene_0", "trait"])
+
+        for result in results:
+            if result['error'] is not None:
+                writer.writerow([result['family'], result['seconds'], result['error'], "", "", "", "", ""])
+
+            for person, distribution in result['probabilities'].items():
+                writer.writerow([
+                    result['family'], result['seconds'], "", person,
+                    distribution['gene'][2], distribution['gene'][1], distribution['gene'][0],
+                    distribution['trait'][True]
+                ])
+
+
+if __name__ == "__main__":
+    main()
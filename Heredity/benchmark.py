@@ -0,0 +1,114 @@
+"""
+Time the Heredity inference engines on synthetic pedigrees of growing size.
+"""
+
+import argparse
+import time
+import tracemalloc
+
+from batch import session_probabilities
+from generate import generate_pedigree
+from heredity import compute_probabilities
+from sampling import BURN_IN, sample_probabilities
+
+SIZES = [3, 4, 5, 6, 10, 25, 50, 100, 250]
+ENUMERATE_LIMIT = 6
+SAMPLES = 2000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Heredity inference engines on synthetic pedigrees.")
+
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES, help="pedigree sizes to benchmark")
+    parser.add_argument("--observed", type=float, default=.5, help="fraction of people with a known trait")
+    parser.add_argument("--enumerate-limit", type=int, default=ENUMERATE_LIMIT,
+                        help="largest pedigree solved by full enumeration")
+    parser.add_argument("--samples", type=int, default=SAMPLES, help="Gibbs sweeps per chain, 0 to skip sampling")
+    parser.add_argument("--burn-in", type=int, default=None,
+                        help=f"sweeps discarded at the start of each chain, defaults to a tenth of samples up to {BURN_IN}")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the generated pedigrees")
+
+    args = parser.parse_args()
+
+    if args.burn_in is None:
+        args.burn_in = min(BURN_IN, args.samples // 10)
+
+    if args.samples and args.samples <= args.burn_in:
+        parser.error("samples must exceed burn-in, or every sweep is discarded")
+
+    print(f"{'size':>6} {'engine':>10} {'seconds':>10} {'peak KiB':>10} {'max error':>10}")
+
+    for size in args.sizes:
+        people = generate_pedigree(size, observed=args.observed, seed=args.seed + size)
+
+        engines = [('session', session_probabilities, True)]
+
+        if size <= args.enumerate_limit:
+            engines.append(('enumerate', compute_probabilities, True))
+
+        # Forked sampling workers would inherit memory tracing and crawl, so the sampler is only timed
+        if args.samples:
+            engines.append((
+                'sampling',
+                lambda people_: sample_probabilities(people_, samples=args.samples, burn_in=args.burn_in)[0],
+                False
+            ))
+
+        reference = None
+
+        for name, engine, trace in engines:
+            probabilities, seconds, peak = measure(engine, people, trace)
+
+            # The session engine is exact, so every other engine is compared against it
+            if reference is None:
+                reference = probabilities
+
+            error = max_difference(reference, probabilities)
+
+            peak = "-" if peak is None else f"{peak / 1024:.1f}"
+
+            print(f"{size:>6} {name:>10} {seconds:>10.4f} {peak:>10} {error:>10.2e}")
+
+
+def measure(engine, people, trace=True):
+    """
+    Run `engine` on `people`, returning its result, the elapsed time and the peak traced memory in bytes.
+    Time is measured on a separate untraced run, since tracing slows allocation down.
+    The peak is None when `trace` is False.
+    """
+
+    start = time.perf_counter()
+
+    probabilities = engine(people)
+
+    seconds = time.perf_counter() - start
+
+    if not trace:
+        return probabilities, seconds, None
+
+    tracemalloc.start()
+
+    engine(people)
+
+    _, peak = tracemalloc.get_traced_memory()
+
+    tracemalloc.stop()
+
+    return probabilities, seconds, peak
+
+
+def max_difference(first, second):
+    """
+    Return the largest absolute difference between two sets of gene and trait distributions.
+    """
+
+    return max(
+        abs(first[person][field][value] - second[person][field][value])
+        for person in first
+        for field in first[person]
+        for value in first[person][field]
+    )
+
+
+if __name__ == "__main__":
+    main()
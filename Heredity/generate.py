@@ -0,0 +1,120 @@
+"""
+Generate synthetic multi-generation pedigrees in the format read by `heredity.load_data`.
+"""
+
+import argparse
+import csv
+import random
+import sys
+
+from heredity import PS, inheritance
+
+CHILDREN = 3
+OBSERVED = 0.5
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic pedigree CSV.")
+
+    parser.add_argument("size", type=int, help="number of people in the pedigree")
+    parser.add_argument("--observed", type=float, default=OBSERVED, help="fraction of people with a known trait")
+    parser.add_argument("--children", type=int, default=CHILDREN, help="maximum number of children per couple")
+    parser.add_argument("--seed", type=int, default=None, help="seed for a reproducible pedigree")
+    parser.add_argument("--output", default=None, help="CSV file to write, standard output by default")
+
+    args = parser.parse_args()
+
+    people = generate_pedigree(args.size, observed=args.observed, children=args.children, seed=args.seed)
+
+    if args.output is None:
+        write_pedigree(sys.stdout, people)
+    else:
+        with open(args.output, "w", newline="") as f:
+            write_pedigree(f, people)
+
+
+def generate_pedigree(size, observed=OBSERVED, children=CHILDREN, seed=None):
+    """
+    Return a pedigree of `size` people, as a dictionary in the format of `heredity.load_data`.
+    Descendants marry founders from outside the family, so the pedigree grows generation by generation.
+    Genes and traits are sampled from `PS`, and each trait is kept with probability `observed`.
+    """
+
+    rng = random.Random(seed)
+
+    people = dict()
+    genes = dict()
+
+    def add(mother=None, father=None):
+        """
+        Adds a new person with the given parents and returns their name.
+        """
+
+        name = f"P{len(people):05d}"
+
+        if mother is None:
+            distribution = PS['gene']
+        else:
+            distribution = inheritance(genes[mother], genes[father])
+
+        genes[name] = rng.choices(list(distribution), list(distribution.values()))[0]
+
+        trait = rng.random() < PS['trait'][genes[name]][True]
+
+        people[name] = {
+            "name": name,
+            "mother": mother,
+            "father": father,
+            "trait": trait if rng.random() < observed else None
+        }
+
+        return name
+
+    couples = list()
+
+    while len(people) < size:
+        # Start a new family line whenever every couple has had their children
+        if not couples:
+            if size - len(people) < 2:
+                add()
+
+                break
+
+            couples.append((add(), add()))
+
+            continue
+
+        mother, father = couples.pop(0)
+
+        for _ in range(rng.randint(1, children)):
+            if len(people) >= size:
+                break
+
+            child = add(mother, father)
+
+            # Marry into a new founder when there is room left
+            if size - len(people) >= 2:
+                spouse = add()
+
+                couples.append((child, spouse) if rng.random() < .5 else (spouse, child))
+
+    return people
+
+
+def write_pedigree(f, people):
+    """
+    Write `people` to file object `f` as a pedigree CSV.
+    """
+
+    writer = csv.writer(f)
+
+    writer.writerow(["name", "mother", "father", "trait"])
+
+    for person in people.values():
+        trait = "" if person["trait"] is None else int(person["trait"])
+
+        writer.writerow([person["name"], person["mother"] or "", person["father"] or "", trait])
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 import csv
+import functools
 import itertools
 import sys
 
@@ -38,6 +39,26 @@ def main():
 
     people = load_data(sys.argv[1])
 
+    probabilities = compute_probabilities(people)
+
+    # Print results
+    for person in people:
+        print(f"{person}:")
+
+        for field in probabilities[person]:
+            print(f"    {field.capitalize()}:")
+
+            for value in probabilities[person][field]:
+                p = probabilities[person][field][value]
+
+                print(f"        {value}: {p:.4f}")
+
+
+def compute_probabilities(people):
+    """
+    Compute the gene and trait distribution of every person by enumerating all joint assignments.
+    """
+
     # Keep track of gene and trait probabilities for each person
     probabilities = {
         person: {
@@ -77,17 +98,7 @@ def main():
     # Ensure probabilities sum to 1
     normalize(probabilities)
 
-    # Print results
-    for person in people:
-        print(f"{person}:")
-
-        for field in probabilities[person]:
-            print(f"    {field.capitalize()}:")
-
-            for value in probabilities[person][field]:
-                p = probabilities[person][field][value]
-
-                print(f"        {value}: {p:.4f}")
+    return probabilities
 
 
 def load_data(filename):
@@ -135,49 +146,53 @@ def joint_probability(people, one_gene, two_genes, have_trait):
     Compute and return a joint probability.
     """
 
+    def genes(person):
+        """
+        Returns the number of genes `person` has in this joint assignment.
+        """
+
+        return 1 if person in one_gene else 2 if person in two_genes else 0
+
     cumulative = 1
 
     for person in people:
         mom = people[person]['mother']
         dad = people[person]['father']
 
-        if person in one_gene:
-            if mom is None and dad is None:
-                prob = PS['gene'][1]
-            else:
-                first = .5 if mom in one_gene else 1 - PS['mutation'] if mom in two_genes else PS['mutation']
-
-                first *= .5 if dad in one_gene else PS['mutation'] if dad in two_genes else 1 - PS['mutation']
-
-                second = .5 if mom in one_gene else PS['mutation'] if mom in two_genes else 1 - PS['mutation']
+        if mom is None and dad is None:
+            prob = PS['gene'][genes(person)]
+        else:
+            prob = inheritance(genes(mom), genes(dad))[genes(person)]
 
-                second *= .5 if dad in one_gene else 1 - PS['mutation'] if dad in two_genes else PS['mutation']
+        prob *= PS['trait'][genes(person)][person in have_trait]
 
-                prob = first + second
+        cumulative *= prob
 
-            prob *= PS['trait'][1][person in have_trait]
-        elif person in two_genes:
-            if mom is None and dad is None:
-                prob = PS['gene'][2]
-            else:
-                prob = .5 if mom in one_gene else 1 - PS['mutation'] if mom in two_genes else PS['mutation']
+    return cumulative
 
-                prob *= .5 if dad in one_gene else 1 - PS['mutation'] if dad in two_genes else PS['mutation']
 
-            prob *= PS['trait'][2][person in have_trait]
-        else:
-            if mom is None and dad is None:
-                prob = PS['gene'][0]
-            else:
-                prob = .5 if mom in one_gene else 1 - PS['mutation'] if mom in two_genes else PS['mutation']
+@functools.lru_cache(maxsize=None)
+def inheritance(mother, father):
+    """
+    Return the probability distribution over a child's number of genes, given the number of genes of each parent.
+    Results are cached, so callers must not modify them.
+    """
 
-                prob *= .5 if dad in one_gene else 1 - PS['mutation'] if dad in two_genes else PS['mutation']
+    def passes(genes):
+        """
+        Probability of a parent with `genes` copies of the gene passing one on, mutation included.
+        """
 
-            prob *= PS['trait'][0][person in have_trait]
+        return .5 if genes == 1 else 1 - PS['mutation'] if genes == 2 else PS['mutation']
 
-        cumulative *= prob
+    mom = passes(mother)
+    dad = passes(father)
 
-    return cumulative
+    return {
+        2: mom * dad,
+        1: mom * (1 - dad) + (1 - mom) * dad,
+        0: (1 - mom) * (1 - dad)
+    }
 
 
 def update(probabilities, one_gene, two_genes, have_trait, p):
@@ -0,0 +1,323 @@
+"""
+Approximate inference for large pedigrees through Gibbs sampling.
+"""
+
+import argparse
+import math
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from heredity import PS, inheritance, load_data
+
+CHAINS = 4
+SAMPLES = 5000
+BURN_IN = 500
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Approximate gene and trait probabilities by Gibbs sampling.")
+
+    parser.add_argument("data", help="CSV file with the pedigree")
+    parser.add_argument("--chains", type=int, default=CHAINS, help="number of independent chains")
+    parser.add_argument("--samples", type=int, default=SAMPLES, help="sweeps per chain, burn-in included")
+    parser.add_argument("--burn-in", type=int, default=BURN_IN, help="sweeps discarded at the start of each chain")
+    parser.add_argument("--time", type=float, default=None, help="wall-clock budget per chain, in seconds")
+    parser.add_argument("--seed", type=int, default=None, help="seed for reproducible chains")
+
+    args = parser.parse_args()
+
+    if args.samples <= args.burn_in:
+        parser.error("samples must exceed burn-in, or every sweep is discarded")
+
+    people = load_data(args.data)
+
+    probabilities, diagnostics = sample_probabilities(
+        people, chains=args.chains, samples=args.samples, burn_in=args.burn_in, budget=args.time, seed=args.seed
+    )
+
+    # Print results
+    for person in people:
+        print(f"{person}:")
+
+        for field in probabilities[person]:
+            print(f"    {field.capitalize()}:")
+
+            for value in probabilities[person][field]:
+                p = probabilities[person][field][value]
+
+                print(f"        {value}: {p:.4f}")
+
+        print(f"    ESS: {diagnostics['ess'][person]:.0f}, R-hat: {diagnostics['r_hat'][person]:.3f}")
+
+    print(f"Kept {diagnostics['samples']} samples from {args.chains} chains in {diagnostics['time']:.2f}s "
+          f"(min ESS {min(diagnostics['ess'].values()):.0f}, max R-hat {max(diagnostics['r_hat'].values()):.3f})")
+
+
+def compile_pedigree(people):
+    """
+    Return an index-based description of `people` that can be shipped to worker processes.
+    """
+
+    names = list(people)
+
+    index = {name: i for i, name in enumerate(names)}
+
+    mothers = [index.get(people[name]['mother']) for name in names]
+    fathers = [index.get(people[name]['father']) for name in names]
+
+    # Children are stored together with the index of their other parent
+    children = [list() for _ in names]
+
+    for child in range(len(names)):
+        if mothers[child] is not None:
+            children[mothers[child]].append((child, fathers[child], True))
+
+        if fathers[child] is not None:
+            children[fathers[child]].append((child, mothers[child], False))
+
+    return {
+        'names': names,
+        'mothers': mothers,
+        'fathers': fathers,
+        'children': children,
+        'traits': [people[name]['trait'] for name in names]
+    }
+
+
+def gene_tables():
+    """
+    Return the unconditional gene distribution and the inheritance table built from `PS`, indexed by gene count.
+    """
+
+    prior = [PS['gene'][genes] for genes in range(3)]
+
+    table = [
+        [[inheritance(mother, father)[genes] for genes in range(3)] for father in range(3)]
+        for mother in range(3)
+    ]
+
+    return prior, table
+
+
+def run_chain(model, samples, burn_in, budget, seed):
+    """
+    Run one Gibbs chain over the gene assignments of `model`.
+    Returns Rao-Blackwellized marginal totals and a summary of each person's gene-count trace.
+    """
+
+    rng = random.Random(seed)
+
+    prior, table = gene_tables()
+
+    mothers = model['mothers']
+    fathers = model['fathers']
+    children = model['children']
+    traits = model['traits']
+
+    n = len(mothers)
+
+    # Evidence likelihood of every gene count for each person
+    likelihood = [
+        [1 if trait is None else PS['trait'][genes][trait] for genes in range(3)]
+        for trait in traits
+    ]
+
+    genes = [rng.choices(range(3), prior)[0] for _ in range(n)]
+
+    gene_totals = [[0.0] * 3 for _ in range(n)]
+    trait_totals = [0.0] * n
+
+    traces = [list() for _ in range(n)]
+
+    deadline = None if budget is None else time.monotonic() + budget
+
+    for sweep in range(samples):
+        keep = sweep >= burn_in
+
+        for i in range(n):
+            mom = mothers[i]
+            dad = fathers[i]
+
+            weights = list()
+
+            for value in range(3):
+                if mom is None and dad is None:
+                    weight = prior[value]
+                else:
+                    weight = table[0 if mom is None else genes[mom]][0 if dad is None else genes[dad]][value]
+
+                weight *= likelihood[i][value]
+
+                for child, other, maternal in children[i]:
+                    other = 0 if other is None else genes[other]
+
+                    if maternal:
+                        weight *= table[value][other][genes[child]]
+                    else:
+                        weight *= table[other][value][genes[child]]
+
+                weights.append(weight)
+
+            total = sum(weights)
+
+            genes[i] = rng.choices(range(3), weights)[0]
+
+            if keep:
+                for value in range(3):
+                    gene_totals[i][value] += weights[value] / total
+
+                if traits[i] is None:
+                    trait_totals[i] += sum(weights[value] / total * PS['trait'][value][True] for value in range(3))
+                else:
+                    trait_totals[i] += traits[i]
+
+                traces[i].append(genes[i])
+
+        if deadline is not None and time.monotonic() > deadline:
+            break
+
+    return {
+        'gene': gene_totals,
+        'trait': trait_totals,
+        'kept': len(traces[0]) if traces else 0,
+        'summaries': [summarize(trace) for trace in traces]
+    }
+
+
+def summarize(trace):
+    """
+    Return the length, mean, variance and effective sample size of a single chain trace.
+    """
+
+    n = len(trace)
+
+    if n < 2:
+        return n, float(sum(trace)) / max(n, 1), 0.0, float(n)
+
+    mean = sum(trace) / n
+
+    centered = [x - mean for x in trace]
+
+    variance = sum(x * x for x in centered) / (n - 1)
+
+    return n, mean, variance, effective_sample_size(centered, variance)
+
+
+def effective_sample_size(centered, variance):
+    """
+    Estimate the effective sample size of a centered trace with Geyer's initial positive sequence.
+    """
+
+    n = len(centered)
+
+    if variance == 0:
+        return float(n)
+
+    def autocorrelation(lag):
+        """
+        Returns the sample autocorrelation of the trace at `lag`.
+        """
+
+        return sum(centered[i] * centered[i + lag] for i in range(n - lag)) / ((n - 1) * variance)
+
+    tau = -1.0
+
+    lag = 0
+
+    while lag + 1 < n:
+        pair = autocorrelation(lag) + autocorrelation(lag + 1)
+
+        if pair <= 0:
+            break
+
+        tau += 2 * pair
+
+        lag += 2
+
+    return n / max(tau, 1 / n)
+
+
+def potential_scale_reduction(summaries):
+    """
+    Return the Gelman-Rubin R-hat statistic from per-chain (length, mean, variance) summaries.
+    """
+
+    summaries = [summary for summary in summaries if summary[0] > 1]
+
+    if len(summaries) < 2:
+        return float('nan')
+
+    m = len(summaries)
+    n = sum(summary[0] for summary in summaries) / m
+
+    means = [summary[1] for summary in summaries]
+    grand = sum(means) / m
+
+    between = n * sum((mean - grand) ** 2 for mean in means) / (m - 1)
+    within = sum(summary[2] for summary in summaries) / m
+
+    if within == 0:
+        return 1.0 if between == 0 else float('inf')
+
+    return math.sqrt(((n - 1) / n * within + between / n) / within)
+
+
+def sample_probabilities(people, chains=CHAINS, samples=SAMPLES, burn_in=BURN_IN, budget=None, seed=None):
+    """
+    Estimate gene and trait probabilities of `people` with `chains` Gibbs chains run in a process pool.
+    Each chain stops after `samples` sweeps or `budget` seconds, whichever comes first.
+    Returns the probabilities, in the same format as `heredity.main`, and a dictionary of diagnostics.
+    """
+
+    if samples <= burn_in:
+        raise ValueError(f"Samples ({samples}) must exceed burn-in ({burn_in}), or every sweep is discarded.")
+
+    model = compile_pedigree(people)
+
+    names = model['names']
+
+    seeds = random.Random(seed).sample(range(2 ** 32), chains)
+
+    start = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=chains) as executor:
+        results = list(executor.map(
+            run_chain, [model] * chains, [samples] * chains, [burn_in] * chains, [budget] * chains, seeds
+        ))
+
+    elapsed = time.perf_counter() - start
+
+    kept = sum(result['kept'] for result in results)
+
+    if not kept:
+        raise ValueError("Sampling budget ended before burn-in completed.")
+
+    probabilities = dict()
+
+    ess = dict()
+    r_hat = dict()
+
+    for i, person in enumerate(names):
+        trait = sum(result['trait'][i] for result in results) / kept
+
+        probabilities[person] = {
+            'gene': {
+                genes: sum(result['gene'][i][genes] for result in results) / kept for genes in (2, 1, 0)
+            },
+            'trait': {
+                True: trait,
+                False: 1 - trait
+            }
+        }
+
+        summaries = [result['summaries'][i] for result in results]
+
+        ess[person] = sum(summary[3] for summary in summaries)
+        r_hat[person] = potential_scale_reduction(summaries)
+
+    return probabilities, {'samples': kept, 'time': elapsed, 'ess': ess, 'r_hat': r_hat}
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,379 @@
+"""
+Exact, evidence-incremental inference over a compiled pedigree.
+"""
+
+import itertools
+import sys
+import time
+
+from heredity import PS, inheritance, load_data
+
+
+class Factor:
+    """
+    Table of non-negative values over the gene counts of the people in `scope`.
+    """
+
+    def __init__(self, scope, table):
+        self.scope = tuple(scope)
+        self.table = table
+
+    def __repr__(self):
+        return f"Factor({self.scope})"
+
+    def value(self, assignment):
+        """
+        Returns the value of the factor for a dictionary mapping people to gene counts.
+        """
+
+        return self.table[tuple(assignment[variable] for variable in self.scope)]
+
+
+def combine(factors, scope, keep):
+    """
+    Multiply `factors` over `scope` and sum out every variable not in `keep`.
+    """
+
+    keep = tuple(keep)
+
+    positions = {variable: i for i, variable in enumerate(scope)}
+
+    projections = [
+        (factor.table, [positions[variable] for variable in factor.scope]) for factor in factors
+    ]
+
+    kept = [positions[variable] for variable in keep]
+
+    table = dict()
+
+    for assignment in itertools.product(range(3), repeat=len(scope)):
+        value = 1
+
+        for values, indices in projections:
+            value *= values[tuple(assignment[i] for i in indices)]
+
+            if not value:
+                break
+
+        key = tuple(assignment[i] for i in kept)
+
+        table[key] = table.get(key, 0) + value
+
+    return Factor(keep, table)
+
+
+class Session:
+    """
+    Pedigree compiled into a bucket tree whose messages are cached between queries.
+    Adding or retracting evidence only invalidates the messages that depend on it.
+    """
+
+    def __init__(self, people):
+        self.names = list(people)
+
+        self.index = {name: i for i, name in enumerate(self.names)}
+
+        # Gene-count factor of each person, conditioned on their parents if known
+        self.factors = [self.gene_factor(people, name) for name in self.names]
+
+        # Observed evidence, kept apart from the structure so that it can change cheaply
+        self.traits = [people[name]['trait'] for name in self.names]
+        self.genes = [None for _ in self.names]
+
+        self.compile()
+
+        self.up = dict()
+        self.down = dict()
+        self.marginals = dict()
+
+    def gene_factor(self, people, name):
+        """
+        Returns the factor for the number of genes of `name` given their parents.
+        """
+
+        person = self.index[name]
+
+        mother = self.index.get(people[name]['mother'])
+        father = self.index.get(people[name]['father'])
+
+        if mother is None and father is None:
+            return Factor((person,), {(genes,): PS['gene'][genes] for genes in range(3)})
+
+        parents = [parent for parent in (mother, father) if parent is not None]
+
+        table = dict()
+
+        for assignment in itertools.product(range(3), repeat=len(parents) + 1):
+            genes = dict(zip([person] + parents, assignment))
+
+            table[assignment] = inheritance(genes.get(mother, 0), genes.get(father, 0))[genes[person]]
+
+        return Factor([person] + parents, table)
+
+    def compile(self):
+        """
+        Choose an elimination order and build the bucket tree used for message passing.
+        """
+
+        n = len(self.names)
+
+        # Moralized graph: every family factor connects its whole scope
+        neighbors = [set() for _ in range(n)]
+
+        for factor in self.factors:
+            for a, b in itertools.permutations(factor.scope, 2):
+                neighbors[a].add(b)
+
+        # Greedy min-degree elimination order
+        remaining = set(range(n))
+
+        self.order = list()
+
+        while remaining:
+            variable = min(remaining, key=lambda v: (len(neighbors[v]), v))
+
+            for a, b in itertools.permutations(neighbors[variable], 2):
+                neighbors[a].add(b)
+
+            for other in neighbors[variable]:
+                neighbors[other].discard(variable)
+
+            remaining.remove(variable)
+
+            self.order.append(variable)
+
+        position = {variable: i for i, variable in enumerate(self.order)}
+
+        # Each factor lives in the bucket of its first eliminated variable
+        self.bucket = [list() for _ in range(n)]
+
+        for factor in self.factors:
+            self.bucket[min(factor.scope, key=position.get)].append(factor)
+
+        # Work out bucket scopes and which bucket each message is sent to
+        self.scope = [None] * n
+        self.parent = [None] * n
+        self.children = [list() for _ in range(n)]
+
+        for variable in self.order:
+            scope = {variable}
+
+            for factor in self.bucket[variable]:
+                scope.update(factor.scope)
+
+            for child in self.children[variable]:
+                scope.update(self.separator(child))
+
+            self.scope[variable] = tuple(sorted(scope, key=position.get))
+
+            if len(scope) > 1:
+                parent = self.scope[variable][1]
+
+                self.parent[variable] = parent
+                self.children[parent].append(variable)
+
+    def separator(self, variable):
+        """
+        Returns the scope of the message sent from the bucket of `variable` to its parent.
+        """
+
+        return self.scope[variable][1:]
+
+    def evidence(self, variable):
+        """
+        Returns the evidence factor for a single person given their observed trait and genes.
+        """
+
+        trait = self.traits[variable]
+        observed = self.genes[variable]
+
+        return Factor((variable,), {
+            (genes,): (1 if trait is None else PS['trait'][genes][trait]) * (observed is None or observed == genes)
+            for genes in range(3)
+        })
+
+    def local(self, variable):
+        """
+        Returns the factors stored in the bucket of `variable`, evidence included.
+        """
+
+        return self.bucket[variable] + [self.evidence(variable)]
+
+    def upward(self, variable):
+        """
+        Returns the cached message from the bucket of `variable` to its parent, computing it if needed.
+        """
+
+        if variable not in self.up:
+            factors = self.local(variable) + [self.upward(child) for child in self.children[variable]]
+
+            self.up[variable] = combine(factors, self.scope[variable], self.separator(variable))
+
+        return self.up[variable]
+
+    def downward(self, variable):
+        """
+        Returns the cached message from the parent of `variable` into its bucket, computing it if needed.
+        """
+
+        if variable not in self.down:
+            parent = self.parent[variable]
+
+            if parent is None:
+                self.down[variable] = Factor((), {(): 1})
+            else:
+                factors = self.local(parent) + [self.downward(parent)] + [
+                    self.upward(child) for child in self.children[parent] if child != variable
+                ]
+
+                self.down[variable] = combine(factors, self.scope[parent], self.separator(variable))
+
+        return self.down[variable]
+
+    def invalidate(self, variable):
+        """
+        Drop every cached message that depends on the evidence of `variable`.
+        """
+
+        path = set()
+
+        while variable is not None:
+            path.add(variable)
+
+            self.up.pop(variable, None)
+
+            variable = self.parent[variable]
+
+        # A downward message only depends on evidence outside the subtree it is sent into
+        for other in list(self.down):
+            if other not in path:
+                del self.down[other]
+
+        self.marginals.clear()
+
+    def observe_trait(self, name, trait):
+        """
+        Set the observed trait of `name`, or retract it by passing None.
+        """
+
+        variable = self.index[name]
+
+        if self.traits[variable] != trait:
+            self.traits[variable] = trait
+
+            self.invalidate(variable)
+
+    def observe_gene(self, name, genes):
+        """
+        Set the observed number of genes of `name`, or retract it by passing None.
+        """
+
+        variable = self.index[name]
+
+        if self.genes[variable] != genes:
+            self.genes[variable] = genes
+
+            self.invalidate(variable)
+
+    def probability(self, name):
+        """
+        Returns the gene and trait distribution of `name` given all current evidence.
+        """
+
+        if name not in self.marginals:
+            variable = self.index[name]
+
+            factors = self.local(variable) + [self.downward(variable)] + [
+                self.upward(child) for child in self.children[variable]
+            ]
+
+            belief = combine(factors, self.scope[variable], (variable,))
+
+            total = sum(belief.table.values())
+
+            if not total:
+                raise ValueError("Observed evidence is impossible.")
+
+            genes = {value: belief.table[(value,)] / total for value in (2, 1, 0)}
+
+            if self.traits[variable] is None:
+                trait = sum(genes[value] * PS['trait'][value][True] for value in genes)
+            else:
+                trait = float(self.traits[variable])
+
+            self.marginals[name] = {
+                'gene': genes,
+                'trait': {
+                    True: trait,
+                    False: 1 - trait
+                }
+            }
+
+        return self.marginals[name]
+
+    def probabilities(self):
+        """
+        Returns the distributions of every person, in the same format as `heredity.main`.
+        """
+
+        return {name: self.probability(name) for name in self.names}
+
+
+def main():
+    # Check for proper usage
+    if len(sys.argv) != 2:
+        sys.exit("Usage: python session.py data.csv")
+
+    session = Session(load_data(sys.argv[1]))
+
+    print("Commands: trait NAME 1|0|-, gene NAME 2|1|0|-, show [NAME], quit")
+
+    while True:
+        try:
+            command = input("> ").split()
+        except EOFError:
+            break
+
+        if not command:
+            continue
+        elif command[0] == "quit":
+            break
+
+        start = time.perf_counter()
+
+        try:
+            if command[0] == "trait" and len(command) == 3:
+                session.observe_trait(command[1], None if command[2] == "-" else command[2] == "1")
+            elif command[0] == "gene" and len(command) == 3:
+                session.observe_gene(command[1], None if command[2] == "-" else int(command[2]))
+            elif command[0] != "show":
+                print("Unknown command.")
+
+                continue
+
+            names = command[1:2] if command[0] == "show" and len(command) == 2 else session.names
+
+            probabilities = {name: session.probability(name) for name in names}
+        except (KeyError, ValueError) as e:
+            print(f"Error: {e}")
+
+            continue
+
+        elapsed = time.perf_counter() - start
+
+        for person in probabilities:
+            print(f"{person}:")
+
+            for field in probabilities[person]:
+                print(f"    {field.capitalize()}:")
+
+                for value in probabilities[person][field]:
+                    p = probabilities[person][field][value]
+
+                    print(f"        {value}: {p:.4f}")
+
+        print(f"Updated in {elapsed * 1000:.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
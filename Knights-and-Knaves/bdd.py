@@ -0,0 +1,277 @@
+"""
+Reduced ordered binary decision diagrams for logical sentences.
+"""
+
+FALSE = 0
+TRUE = 1
+
+
+class BDD:
+    """
+    Manager of reduced ordered binary decision diagrams sharing one unique table and one operation cache.
+    Nodes are integers: 0 and 1 are the terminals, any other node indexes `self.nodes`.
+    Variables are ordered as in `order`, and symbols met later are appended after them.
+    """
+
+    def __init__(self, order=()):
+        self.order = list()
+        self.levels = dict()
+
+        # Every node is a (level, low, high) triple, the terminals sit below every variable
+        self.nodes = [(float('inf'), None, None), (float('inf'), None, None)]
+
+        self.unique = dict()
+        self.cache = dict()
+
+        self.sentences = dict()
+
+        for name in order:
+            self.level(name)
+
+    def level(self, name):
+        """
+        Returns the position of symbol `name` in the variable order, adding it at the end if needed.
+        """
+
+        if name not in self.levels:
+            self.levels[name] = len(self.order)
+            self.order.append(name)
+
+        return self.levels[name]
+
+    def make(self, level, low, high):
+        """
+        Returns the unique node testing the variable at `level`, skipping redundant tests.
+        """
+
+        if low == high:
+            return low
+
+        key = (level, low, high)
+
+        if key not in self.unique:
+            self.unique[key] = len(self.nodes)
+            self.nodes.append(key)
+
+        return self.unique[key]
+
+    def variable(self, name):
+        """
+        Returns the node that is true exactly when symbol `name` is.
+        """
+
+        return self.make(self.level(name), FALSE, TRUE)
+
+    def ite(self, f, g, h):
+        """
+        Returns the node for "if f then g else h", the operation every connective is built from.
+        """
+
+        # Terminal cases
+        if f == TRUE:
+            return g
+        elif f == FALSE:
+            return h
+        elif g == h:
+            return g
+        elif g == TRUE and h == FALSE:
+            return f
+
+        key = (f, g, h)
+
+        if key in self.cache:
+            return self.cache[key]
+
+        # Split on the topmost variable of the three operands
+        level = min(self.nodes[f][0], self.nodes[g][0], self.nodes[h][0])
+
+        low = self.ite(*[self.cofactor(node, level, False) for node in (f, g, h)])
+        high = self.ite(*[self.cofactor(node, level, True) for node in (f, g, h)])
+
+        result = self.make(level, low, high)
+
+        self.cache[key] = result
+
+        return result
+
+    def cofactor(self, node, level, value):
+        """
+        Returns `node` restricted to the variable at `level` being `value`.
+        """
+
+        node_level, low, high = self.nodes[node]
+
+        if node_level != level:
+            return node
+
+        return high if value else low
+
+    def negate(self, f):
+        """
+        Returns the node for not f.
+        """
+
+        return self.ite(f, FALSE, TRUE)
+
+    def conjoin(self, nodes):
+        """
+        Returns the node for the conjunction of `nodes`.
+        """
+
+        result = TRUE
+
+        for node in nodes:
+            result = self.ite(result, node, FALSE)
+
+        return result
+
+    def disjoin(self, nodes):
+        """
+        Returns the node for the disjunction of `nodes`.
+        """
+
+        result = FALSE
+
+        for node in nodes:
+            result = self.ite(result, TRUE, node)
+
+        return result
+
+    def implies(self, f, g):
+        """
+        Returns the node for f => g.
+        """
+
+        return self.ite(f, g, TRUE)
+
+    def equivalent(self, f, g):
+        """
+        Returns the node for f <=> g.
+        """
+
+        return self.ite(f, g, self.negate(g))
+
+    def node(self, sentence):
+        """
+        Returns the node equivalent to `sentence`, building it if needed.
+        """
+
+        if sentence not in self.sentences:
+            self.sentences[sentence] = sentence.diagram(self)
+
+        return self.sentences[sentence]
+
+    def count(self, node):
+        """
+        Returns the number of assignments to every variable of the manager that satisfy `node`.
+        """
+
+        counts = {FALSE: 0, TRUE: 1}
+
+        def below(child, level):
+            """
+            Returns the satisfying assignments of the variables from `level` down, through `child`.
+            """
+
+            child_level = min(self.nodes[child][0], len(self.order))
+
+            return visit(child) << (child_level - level - 1)
+
+        def visit(current):
+            """
+            Returns the satisfying assignments of the variables from the level of `current` down.
+            """
+
+            if current not in counts:
+                level, low, high = self.nodes[current]
+
+                counts[current] = below(low, level) + below(high, level)
+
+            return counts[current]
+
+        top = min(self.nodes[node][0], len(self.order))
+
+        return visit(node) << top
+
+    def models(self, node):
+        """
+        Yields every assignment to the variables of the manager that satisfies `node`, as a dictionary.
+        """
+
+        stack = [(node, 0, dict())]
+
+        while stack:
+            current, level, model = stack.pop()
+
+            if current == FALSE:
+                continue
+
+            if level == len(self.order):
+                yield model
+
+                continue
+
+            name = self.order[level]
+
+            node_level, low, high = self.nodes[current]
+
+            # Variables the diagram skips take both values
+            if node_level != level:
+                low = high = current
+
+            stack.append((low, level + 1, {**model, name: False}))
+            stack.append((high, level + 1, {**model, name: True}))
+
+
+def manager(sentences, order=None):
+    """
+    Returns a manager over the symbols of `sentences`, ordered as in `order` first and by name after.
+    """
+
+    symbols = set().union(*[sentence.symbols() for sentence in sentences])
+
+    order = [name for name in (order or ()) if name in symbols]
+
+    return BDD(order + sorted(symbols.difference(order)))
+
+
+def entails(knowledge, query, order=None):
+    """
+    Checks if knowledge base entails query, that is, if knowledge implies query is the true diagram.
+    """
+
+    bdd = manager([knowledge, query], order)
+
+    return bdd.implies(bdd.node(knowledge), bdd.node(query)) == TRUE
+
+
+def entails_all(knowledge, queries, order=None):
+    """
+    Checks which of `queries` the knowledge base entails, building the knowledge base diagram once.
+    """
+
+    bdd = manager([knowledge] + list(queries), order)
+
+    kb = bdd.node(knowledge)
+
+    return [bdd.implies(kb, bdd.node(query)) == TRUE for query in queries]
+
+
+def count_models(sentence, order=None):
+    """
+    Returns the number of models over the symbols of `sentence` in which it is true.
+    """
+
+    bdd = manager([sentence], order)
+
+    return bdd.count(bdd.node(sentence))
+
+
+def models(sentence, order=None):
+    """
+    Yields every model over the symbols of `sentence` in which it is true.
+    """
+
+    bdd = manager([sentence], order)
+
+    yield from bdd.models(bdd.node(sentence))
@@ -1,4 +1,60 @@
+import weakref
+
+import bdd
+import sat
+import truth_table
+
+
 class Sentence:
+    """
+    Immutable logical sentence.
+    Sentences are hash-consed: building a sentence equal to an existing one returns the existing object,
+    so identical subformulas are shared and equality is identity.
+    """
+
+    __slots__ = ("_arguments", "_hash", "_symbols", "__weakref__")
+
+    _nodes = weakref.WeakValueDictionary()
+
+    @classmethod
+    def intern(cls, *arguments):
+        """
+        Returns the unique sentence of this class built from `arguments`.
+        """
+
+        key = (cls,) + arguments
+
+        sentence = Sentence._nodes.get(key)
+
+        if sentence is None:
+            sentence = object.__new__(cls)
+
+            object.__setattr__(sentence, "_arguments", arguments)
+            object.__setattr__(sentence, "_hash", hash(key))
+            object.__setattr__(sentence, "_symbols", None)
+
+            Sentence._nodes[key] = sentence
+
+        return sentence
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Sentences are immutable.")
+
+    def __delattr__(self, name):
+        raise AttributeError("Sentences are immutable.")
+
+    def __hash__(self):
+        return self._hash
+
+    def __reduce__(self):
+        return type(self), self._arguments
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
     def evaluate(self, model):
         """
         Evaluates the logical sentence.
@@ -6,6 +62,35 @@ class Sentence:
 
         raise Exception("Nothing to evaluate.")
 
+    def evaluate_partial(self, model):
+        """
+        Evaluates the logical sentence in a model that may leave symbols unassigned.
+        Returns True or False when the assigned symbols decide the sentence, None otherwise.
+        """
+
+        raise Exception("Nothing to evaluate.")
+
+    def compile(self, program):
+        """
+        Adds the instructions computing the logical sentence to a `truth_table.Program`, returning its register.
+        """
+
+        raise Exception("Nothing to compile.")
+
+    def diagram(self, manager):
+        """
+        Builds the logical sentence in a `bdd.BDD` manager, returning its node.
+        """
+
+        raise Exception("Nothing to build.")
+
+    def encode(self, encoding):
+        """
+        Adds the Tseitin clauses of the logical sentence to a `sat.Encoding`, returning its literal.
+        """
+
+        raise Exception("Nothing to encode.")
+
     def formula(self):
         """
         Returns string formula representing logical sentence.
@@ -15,10 +100,15 @@ class Sentence:
 
     def symbols(self):
         """
-        Returns a set of all symbols in the logical sentence.
+        Returns a frozen set of all symbols in the logical sentence, computed once per sentence.
         """
 
-        return set()
+        if self._symbols is None:
+            object.__setattr__(self, "_symbols", frozenset().union(
+                *[operand.symbols() for operand in self._arguments]
+            ))
+
+        return self._symbols
 
     @classmethod
     def validate(cls, sentence):
@@ -58,14 +148,14 @@ class Sentence:
 
 
 class Symbol(Sentence):
-    def __init__(self, name):
-        self.name = name
+    __slots__ = ()
 
-    def __eq__(self, other):
-        return isinstance(other, Symbol) and self.name == other.name
+    def __new__(cls, name):
+        return cls.intern(name)
 
-    def __hash__(self):
-        return hash(("symbol", self.name))
+    @property
+    def name(self):
+        return self._arguments[0]
 
     def __repr__(self):
         return self.name
@@ -76,24 +166,39 @@ class Symbol(Sentence):
         except KeyError:
             raise Exception(f"Variable {self.name} not in model.")
 
+    def evaluate_partial(self, model):
+        return model.get(self.name)
+
+    def compile(self, program):
+        return program.symbol(self.name)
+
+    def diagram(self, manager):
+        return manager.variable(self.name)
+
+    def encode(self, encoding):
+        return encoding.variable(self.name)
+
     def formula(self):
         return self.name
 
     def symbols(self):
-        return {self.name}
+        if self._symbols is None:
+            object.__setattr__(self, "_symbols", frozenset((self.name,)))
+
+        return self._symbols
 
 
 class Not(Sentence):
-    def __init__(self, operand):
+    __slots__ = ()
+
+    def __new__(cls, operand):
         Sentence.validate(operand)
 
-        self.operand = operand
+        return cls.intern(operand)
 
-    def __eq__(self, other):
-        return isinstance(other, Not) and self.operand == other.operand
-
-    def __hash__(self):
-        return hash(("not", hash(self.operand)))
+    @property
+    def operand(self):
+        return self._arguments[0]
 
     def __repr__(self):
         return f"Not({self.operand})"
@@ -101,27 +206,36 @@ class Not(Sentence):
     def evaluate(self, model):
         return not self.operand.evaluate(model)
 
+    def evaluate_partial(self, model):
+        value = self.operand.evaluate_partial(model)
+
+        return None if value is None else not value
+
+    def compile(self, program):
+        return program.emit(truth_table.NOT, program.register(self.operand))
+
+    def diagram(self, manager):
+        return manager.negate(manager.node(self.operand))
+
+    def encode(self, encoding):
+        return -encoding.literal(self.operand)
+
     def formula(self):
         return "¬" + Sentence.parenthesize(self.operand.formula())
 
-    def symbols(self):
-        return self.operand.symbols()
-
 
 class And(Sentence):
-    def __init__(self, *conjuncts):
+    __slots__ = ()
+
+    def __new__(cls, *conjuncts):
         for conjunct in conjuncts:
             Sentence.validate(conjunct)
 
-        self.conjuncts = list(conjuncts)
-
-    def __eq__(self, other):
-        return isinstance(other, And) and self.conjuncts == other.conjuncts
+        return cls.intern(*conjuncts)
 
-    def __hash__(self):
-        return hash(
-            ("and", tuple(hash(conjunct) for conjunct in self.conjuncts))
-        )
+    @property
+    def conjuncts(self):
+        return self._arguments
 
     def __repr__(self):
         conjunctions = ", ".join(
@@ -131,13 +245,38 @@ class And(Sentence):
         return f"And({conjunctions})"
 
     def add(self, conjunct):
-        Sentence.validate(conjunct)
+        """
+        Sentences are immutable, so a conjunct cannot be added in place:
+        build the larger knowledge base with And(*knowledge.conjuncts, conjunct) instead.
+        """
 
-        self.conjuncts.append(conjunct)
+        raise AttributeError("Sentences are immutable, use And(*knowledge.conjuncts, conjunct) to add a conjunct.")
 
     def evaluate(self, model):
         return all(conjunct.evaluate(model) for conjunct in self.conjuncts)
 
+    def evaluate_partial(self, model):
+        result = True
+
+        for conjunct in self.conjuncts:
+            value = conjunct.evaluate_partial(model)
+
+            if value is False:
+                return False
+            elif value is None:
+                result = None
+
+        return result
+
+    def compile(self, program):
+        return program.fold(truth_table.AND, [program.register(conjunct) for conjunct in self.conjuncts], True)
+
+    def diagram(self, manager):
+        return manager.conjoin([manager.node(conjunct) for conjunct in self.conjuncts])
+
+    def encode(self, encoding):
+        return encoding.conjunction([encoding.literal(conjunct) for conjunct in self.conjuncts])
+
     def formula(self):
         if len(self.conjuncts) == 1:
             return self.conjuncts[0].formula()
@@ -145,24 +284,19 @@ class And(Sentence):
         return " ∧ ".join([Sentence.parenthesize(conjunct.formula())
                            for conjunct in self.conjuncts])
 
-    def symbols(self):
-        return set.union(*[conjunct.symbols() for conjunct in self.conjuncts])
-
 
 class Or(Sentence):
-    def __init__(self, *disjuncts):
+    __slots__ = ()
+
+    def __new__(cls, *disjuncts):
         for disjunct in disjuncts:
             Sentence.validate(disjunct)
 
-        self.disjuncts = list(disjuncts)
+        return cls.intern(*disjuncts)
 
-    def __eq__(self, other):
-        return isinstance(other, Or) and self.disjuncts == other.disjuncts
-
-    def __hash__(self):
-        return hash(
-            ("or", tuple(hash(disjunct) for disjunct in self.disjuncts))
-        )
+    @property
+    def disjuncts(self):
+        return self._arguments
 
     def __repr__(self):
         disjuncts = ", ".join([str(disjunct) for disjunct in self.disjuncts])
@@ -172,6 +306,28 @@ class Or(Sentence):
     def evaluate(self, model):
         return any(disjunct.evaluate(model) for disjunct in self.disjuncts)
 
+    def evaluate_partial(self, model):
+        result = False
+
+        for disjunct in self.disjuncts:
+            value = disjunct.evaluate_partial(model)
+
+            if value is True:
+                return True
+            elif value is None:
+                result = None
+
+        return result
+
+    def compile(self, program):
+        return program.fold(truth_table.OR, [program.register(disjunct) for disjunct in self.disjuncts], False)
+
+    def diagram(self, manager):
+        return manager.disjoin([manager.node(disjunct) for disjunct in self.disjuncts])
+
+    def encode(self, encoding):
+        return encoding.disjunction([encoding.literal(disjunct) for disjunct in self.disjuncts])
+
     def formula(self):
         if len(self.disjuncts) == 1:
             return self.disjuncts[0].formula()
@@ -179,25 +335,23 @@ class Or(Sentence):
         return " ∨  ".join([Sentence.parenthesize(disjunct.formula())
                             for disjunct in self.disjuncts])
 
-    def symbols(self):
-        return set.union(*[disjunct.symbols() for disjunct in self.disjuncts])
-
 
 class Implication(Sentence):
-    def __init__(self, antecedent, consequent):
+    __slots__ = ()
+
+    def __new__(cls, antecedent, consequent):
         Sentence.validate(antecedent)
         Sentence.validate(consequent)
 
-        self.antecedent = antecedent
-        self.consequent = consequent
+        return cls.intern(antecedent, consequent)
 
-    def __eq__(self, other):
-        return (isinstance(other, Implication)
-                and self.antecedent == other.antecedent
-                and self.consequent == other.consequent)
+    @property
+    def antecedent(self):
+        return self._arguments[0]
 
-    def __hash__(self):
-        return hash(("implies", hash(self.antecedent), hash(self.consequent)))
+    @property
+    def consequent(self):
+        return self._arguments[1]
 
     def __repr__(self):
         return f"Implication({self.antecedent}, {self.consequent})"
@@ -206,31 +360,53 @@ class Implication(Sentence):
         return ((not self.antecedent.evaluate(model))
                 or self.consequent.evaluate(model))
 
+    def evaluate_partial(self, model):
+        antecedent = self.antecedent.evaluate_partial(model)
+
+        if antecedent is False:
+            return True
+
+        consequent = self.consequent.evaluate_partial(model)
+
+        if consequent is True:
+            return True
+        elif antecedent is None or consequent is None:
+            return None
+
+        return False
+
+    def compile(self, program):
+        return program.emit(truth_table.IMPLIES, program.register(self.antecedent), program.register(self.consequent))
+
+    def diagram(self, manager):
+        return manager.implies(manager.node(self.antecedent), manager.node(self.consequent))
+
+    def encode(self, encoding):
+        return encoding.disjunction([-encoding.literal(self.antecedent), encoding.literal(self.consequent)])
+
     def formula(self):
         antecedent = Sentence.parenthesize(self.antecedent.formula())
         consequent = Sentence.parenthesize(self.consequent.formula())
 
         return f"{antecedent} => {consequent}"
 
-    def symbols(self):
-        return set.union(self.antecedent.symbols(), self.consequent.symbols())
-
 
 class Biconditional(Sentence):
-    def __init__(self, left, right):
+    __slots__ = ()
+
+    def __new__(cls, left, right):
         Sentence.validate(left)
         Sentence.validate(right)
 
-        self.left = left
-        self.right = right
+        return cls.intern(left, right)
 
-    def __eq__(self, other):
-        return (isinstance(other, Biconditional)
-                and self.left == other.left
-                and self.right == other.right)
+    @property
+    def left(self):
+        return self._arguments[0]
 
-    def __hash__(self):
-        return hash(("biconditional", hash(self.left), hash(self.right)))
+    @property
+    def right(self):
+        return self._arguments[1]
 
     def __repr__(self):
         return f"Biconditional({self.left}, {self.right})"
@@ -241,53 +417,115 @@ class Biconditional(Sentence):
                 or (not self.left.evaluate(model)
                     and not self.right.evaluate(model)))
 
+    def evaluate_partial(self, model):
+        left = self.left.evaluate_partial(model)
+        right = self.right.evaluate_partial(model)
+
+        if left is None or right is None:
+            return None
+
+        return left == right
+
+    def compile(self, program):
+        return program.emit(truth_table.IFF, program.register(self.left), program.register(self.right))
+
+    def diagram(self, manager):
+        return manager.equivalent(manager.node(self.left), manager.node(self.right))
+
+    def encode(self, encoding):
+        return encoding.equivalence(encoding.literal(self.left), encoding.literal(self.right))
+
     def formula(self):
         left = Sentence.parenthesize(str(self.left))
         right = Sentence.parenthesize(str(self.right))
 
         return f"{left} <=> {right}"
 
-    def symbols(self):
-        return set.union(self.left.symbols(), self.right.symbols())
-
 
-def model_check(knowledge, query):
+def model_check(knowledge, query, method="sat"):
     """
     Checks if knowledge base entails query.
+    By default a SAT solver decides it, method "bdd" compiles both into binary decision diagrams,
+    method "truth-table" checks every model with bit-parallel evaluation,
+    and method "enumerate" searches the models one at a time, pruning decided branches.
     """
 
-    def check_all(knowledge_, query_, symbols_, model):
-        """
-        Checks if knowledge base entails query, given a particular model.
-        """
+    if method == "sat":
+        return sat.entails(knowledge, query)
+    elif method == "bdd":
+        return bdd.entails(knowledge, query)
+    elif method == "truth-table":
+        return truth_table.entails(knowledge, query)
+    elif method != "enumerate":
+        raise ValueError(f"Unknown model checking method {method}.")
 
-        # If model has an assignment for each symbol
-        if not symbols_:
-            # If knowledge base is true in model, then query must also be true
-            if knowledge_.evaluate(model):
-                return query_.evaluate(model)
+    return check_all(knowledge, [query])[0]
 
-            return True
-        else:
-            # Choose one of the remaining unused symbols
-            remaining = symbols_.copy()
 
-            p = remaining.pop()
+def model_check_all(knowledge, queries, method="sat"):
+    """
+    Checks which of `queries` the knowledge base entails, returning a list of booleans in the same order.
+    The knowledge base is encoded, compiled or enumerated once for all the queries.
+    """
+
+    queries = list(queries)
+
+    if method == "sat":
+        return sat.entails_all(knowledge, queries)
+    elif method == "bdd":
+        return bdd.entails_all(knowledge, queries)
+    elif method == "truth-table":
+        return truth_table.entails_all(knowledge, queries)
+    elif method != "enumerate":
+        raise ValueError(f"Unknown model checking method {method}.")
+
+    return check_all(knowledge, queries)
+
+
+def check_all(knowledge, queries):
+    """
+    Checks which of `queries` the knowledge base entails by searching its models.
+    Partial models are evaluated with three-valued logic, so the search never extends a branch where the
+    knowledge base is already false or every query not yet refuted is already true.
+    """
+
+    symbols = sorted(knowledge.symbols().union(*[query.symbols() for query in queries]))
+
+    # Queries that no model of the knowledge base has refuted yet
+    pending = set(range(len(queries)))
+
+    model = dict()
+
+    # Each entry assigns a value to the symbol at index depth - 1, the root has depth 0
+    stack = [(0, None)]
+
+    while stack and pending:
+        depth, value = stack.pop()
+
+        # Undo the assignments of the branch explored before this one
+        for symbol in symbols[max(depth - 1, 0):len(model)]:
+            del model[symbol]
+
+        if depth:
+            model[symbols[depth - 1]] = value
+
+        kb = knowledge.evaluate_partial(model)
+
+        if kb is False:
+            continue
 
-            # Create a model where the symbol is true
-            model_true = model.copy()
-            model_true[p] = True
+        undecided = False
 
-            # Create a model where the symbol is false
-            model_false = model.copy()
-            model_false[p] = False
+        for i in list(pending):
+            result = queries[i].evaluate_partial(model)
 
-            # Ensure entailment holds in both models
-            return (check_all(knowledge_, query_, remaining, model_true) and
-                    check_all(knowledge_, query_, remaining, model_false))
+            if result is False and kb:
+                pending.remove(i)
+            elif result is not True:
+                undecided = True
 
-    # Get all symbols in both knowledge and query
-    symbols = set.union(knowledge.symbols(), query.symbols())
+        if undecided and depth < len(symbols):
+            stack.append((depth + 1, False))
+            stack.append((depth + 1, True))
 
-    # Check that knowledge entails query
-    return check_all(knowledge, query, symbols, dict())
+    return [i in pending for i in range(len(queries))]
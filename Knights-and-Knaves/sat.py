@@ -0,0 +1,482 @@
+"""
+Satisfiability backend for logical sentences: Tseitin encoding into CNF and a CDCL solver.
+"""
+
+import heapq
+
+DECAY = 0.95
+RESTART = 100
+
+
+class Solver:
+    """
+    Conflict-driven clause learning solver.
+    Clauses are lists of non-zero integer literals, where -v is the negation of variable v.
+    """
+
+    def __init__(self):
+        self.unsatisfiable = False
+
+        # Assignment state
+        self.values = dict()
+        self.levels = dict()
+        self.reasons = dict()
+
+        self.trail = list()
+        self.limits = list()
+        self.head = 0
+
+        # Clauses indexed by the two literals they watch
+        self.watches = dict()
+
+        # Branching heuristic: variable activity with saved phases
+        self.variables = set()
+        self.activity = dict()
+        self.increment = 1.0
+        self.heap = list()
+        self.phases = dict()
+
+        self.model = None
+
+    def value(self, literal):
+        """
+        Returns True or False if `literal` is assigned, None otherwise.
+        """
+
+        value = self.values.get(abs(literal))
+
+        return None if value is None else value == (literal > 0)
+
+    def add_variable(self, variable):
+        """
+        Registers a variable with the branching heuristic.
+        """
+
+        if variable not in self.variables:
+            self.variables.add(variable)
+            self.activity[variable] = 0.0
+
+            heapq.heappush(self.heap, (0.0, variable))
+
+    def add_clause(self, clause):
+        """
+        Adds a clause to the solver, simplifying it against the top-level assignment.
+        """
+
+        self.backtrack(0)
+
+        literals = list()
+
+        for literal in clause:
+            if -literal in literals:
+                return
+
+            if literal not in literals:
+                literals.append(literal)
+
+            self.add_variable(abs(literal))
+
+        if any(self.value(literal) is True for literal in literals):
+            return
+
+        literals = [literal for literal in literals if self.value(literal) is None]
+
+        if not literals:
+            self.unsatisfiable = True
+        elif len(literals) == 1:
+            self.assign(literals[0], None)
+
+            if self.propagate() is not None:
+                self.unsatisfiable = True
+        else:
+            self.watch(literals)
+
+    def watch(self, clause):
+        """
+        Watches the first two literals of a clause.
+        """
+
+        self.watches.setdefault(clause[0], list()).append(clause)
+        self.watches.setdefault(clause[1], list()).append(clause)
+
+    def assign(self, literal, reason):
+        """
+        Makes `literal` true at the current decision level, implied by clause `reason` if any.
+        """
+
+        variable = abs(literal)
+
+        self.values[variable] = literal > 0
+        self.levels[variable] = len(self.limits)
+        self.reasons[variable] = reason
+
+        self.trail.append(literal)
+
+    def propagate(self):
+        """
+        Performs unit propagation, returning a conflicting clause or None.
+        """
+
+        while self.head < len(self.trail):
+            false = -self.trail[self.head]
+
+            self.head += 1
+
+            watching = self.watches.get(false, list())
+
+            kept = list()
+
+            for i, clause in enumerate(watching):
+                # Keep the falsified watch in second position
+                if clause[0] == false:
+                    clause[0], clause[1] = clause[1], clause[0]
+
+                if self.value(clause[0]) is True:
+                    kept.append(clause)
+
+                    continue
+
+                # Look for a replacement watch
+                for k in range(2, len(clause)):
+                    if self.value(clause[k]) is not False:
+                        clause[1], clause[k] = clause[k], clause[1]
+
+                        self.watches.setdefault(clause[1], list()).append(clause)
+
+                        break
+                else:
+                    kept.append(clause)
+
+                    if self.value(clause[0]) is False:
+                        kept.extend(watching[i + 1:])
+
+                        self.watches[false] = kept
+
+                        return clause
+
+                    self.assign(clause[0], clause)
+
+            self.watches[false] = kept
+
+        return None
+
+    def analyze(self, conflict):
+        """
+        Derives a first-UIP learnt clause from a conflict, returning it with the level to backjump to.
+        """
+
+        level = len(self.limits)
+
+        learnt = [None]
+        seen = set()
+
+        counter = 0
+        literal = None
+        index = len(self.trail) - 1
+        clause = conflict
+
+        while True:
+            for other in clause:
+                variable = abs(other)
+
+                if other == literal or variable in seen or self.levels[variable] == 0:
+                    continue
+
+                seen.add(variable)
+
+                self.bump(variable)
+
+                if self.levels[variable] == level:
+                    counter += 1
+                else:
+                    learnt.append(other)
+
+            # Walk back to the next literal of the current level involved in the conflict
+            while abs(self.trail[index]) not in seen:
+                index -= 1
+
+            literal = self.trail[index]
+
+            index -= 1
+            counter -= 1
+
+            seen.discard(abs(literal))
+
+            if not counter:
+                break
+
+            clause = self.reasons[abs(literal)]
+
+        learnt[0] = -literal
+
+        if len(learnt) == 1:
+            return learnt, 0
+
+        # Watch the literal of the highest remaining level second
+        second = max(range(1, len(learnt)), key=lambda k: self.levels[abs(learnt[k])])
+
+        learnt[1], learnt[second] = learnt[second], learnt[1]
+
+        return learnt, self.levels[abs(learnt[1])]
+
+    def bump(self, variable):
+        """
+        Increases the activity of a variable involved in a conflict.
+        """
+
+        self.activity[variable] += self.increment
+
+        if self.activity[variable] > 1e100:
+            for other in self.activity:
+                self.activity[other] *= 1e-100
+
+            self.increment *= 1e-100
+
+            self.heap = [(-self.activity[other], other) for other in self.variables if other not in self.values]
+
+            heapq.heapify(self.heap)
+        else:
+            heapq.heappush(self.heap, (-self.activity[variable], variable))
+
+    def backtrack(self, level):
+        """
+        Undoes every assignment above decision level `level`.
+        """
+
+        if len(self.limits) <= level:
+            return
+
+        for literal in self.trail[self.limits[level]:]:
+            variable = abs(literal)
+
+            self.phases[variable] = self.values.pop(variable)
+
+            del self.levels[variable]
+            del self.reasons[variable]
+
+            heapq.heappush(self.heap, (-self.activity[variable], variable))
+
+        del self.trail[self.limits[level]:]
+        del self.limits[level:]
+
+        self.head = len(self.trail)
+
+    def pick(self):
+        """
+        Returns the unassigned variable with the highest activity, or None if every variable is assigned.
+        """
+
+        while self.heap:
+            activity, variable = heapq.heappop(self.heap)
+
+            if variable not in self.values and -activity == self.activity[variable]:
+                return variable
+
+        return None
+
+    def solve(self, assumptions=()):
+        """
+        Returns True if the clauses are satisfiable with every literal in `assumptions` true, False otherwise.
+        A satisfying assignment is left in `self.model`. Learnt clauses are kept for later calls.
+        """
+
+        self.model = None
+
+        if self.unsatisfiable:
+            return False
+
+        self.backtrack(0)
+
+        for literal in assumptions:
+            self.add_variable(abs(literal))
+
+        conflicts = 0
+        limit = RESTART
+
+        while True:
+            conflict = self.propagate()
+
+            if conflict is not None:
+                if not self.limits:
+                    self.unsatisfiable = True
+
+                    return False
+
+                learnt, level = self.analyze(conflict)
+
+                self.backtrack(level)
+
+                if len(learnt) == 1:
+                    self.assign(learnt[0], None)
+                else:
+                    self.watch(learnt)
+                    self.assign(learnt[0], learnt)
+
+                self.increment /= DECAY
+
+                conflicts += 1
+
+                continue
+
+            if conflicts >= limit:
+                conflicts = 0
+                limit = int(limit * 1.5)
+
+                self.backtrack(0)
+
+                continue
+
+            # Decide assumptions first, one per decision level
+            if len(self.limits) < len(assumptions):
+                literal = assumptions[len(self.limits)]
+
+                if self.value(literal) is False:
+                    self.backtrack(0)
+
+                    return False
+
+                self.limits.append(len(self.trail))
+
+                if self.value(literal) is None:
+                    self.assign(literal, None)
+
+                continue
+
+            variable = self.pick()
+
+            if variable is None:
+                self.model = dict(self.values)
+
+                self.backtrack(0)
+
+                return True
+
+            self.limits.append(len(self.trail))
+
+            self.assign(variable if self.phases.get(variable, False) else -variable, None)
+
+
+class Encoding:
+    """
+    Tseitin encoding of logical sentences into the clauses of a `Solver`.
+    Every sentence is encoded once and shared by all the sentences that contain it.
+    """
+
+    def __init__(self, solver=None):
+        self.solver = Solver() if solver is None else solver
+
+        self.symbols = dict()
+        self.literals = dict()
+
+        self.count = 0
+        self.constant = None
+
+    def fresh(self):
+        """
+        Returns a new variable.
+        """
+
+        self.count += 1
+
+        return self.count
+
+    def variable(self, name):
+        """
+        Returns the variable standing for symbol `name`.
+        """
+
+        if name not in self.symbols:
+            self.symbols[name] = self.fresh()
+
+        return self.symbols[name]
+
+    def true(self):
+        """
+        Returns a literal that is always true.
+        """
+
+        if self.constant is None:
+            self.constant = self.fresh()
+
+            self.add_clause([self.constant])
+
+        return self.constant
+
+    def literal(self, sentence):
+        """
+        Returns a literal equivalent to `sentence`, encoding it if needed.
+        """
+
+        if sentence not in self.literals:
+            self.literals[sentence] = sentence.encode(self)
+
+        return self.literals[sentence]
+
+    def add_clause(self, clause):
+        self.solver.add_clause(clause)
+
+    def conjunction(self, literals):
+        """
+        Returns a literal equivalent to the conjunction of `literals`.
+        """
+
+        if not literals:
+            return self.true()
+        elif len(literals) == 1:
+            return literals[0]
+
+        gate = self.fresh()
+
+        for literal in literals:
+            self.add_clause([-gate, literal])
+
+        self.add_clause([gate] + [-literal for literal in literals])
+
+        return gate
+
+    def disjunction(self, literals):
+        """
+        Returns a literal equivalent to the disjunction of `literals`.
+        """
+
+        return -self.conjunction([-literal for literal in literals])
+
+    def equivalence(self, left, right):
+        """
+        Returns a literal equivalent to `left` <=> `right`.
+        """
+
+        gate = self.fresh()
+
+        self.add_clause([-gate, -left, right])
+        self.add_clause([-gate, left, -right])
+        self.add_clause([gate, left, right])
+        self.add_clause([gate, -left, -right])
+
+        return gate
+
+
+def entails(knowledge, query):
+    """
+    Checks if knowledge base entails query, by showing that knowledge and not query is unsatisfiable.
+    """
+
+    encoding = Encoding()
+
+    encoding.add_clause([encoding.literal(knowledge)])
+    encoding.add_clause([-encoding.literal(query)])
+
+    return not encoding.solver.solve()
+
+
+def entails_all(knowledge, queries):
+    """
+    Checks which of `queries` the knowledge base entails, reusing one incremental solver session.
+    Each query is checked by solving under the assumption that it is false.
+    """
+
+    encoding = Encoding()
+
+    encoding.add_clause([encoding.literal(knowledge)])
+
+    return [not encoding.solver.solve([-encoding.literal(query)]) for query in queries]
@@ -0,0 +1,179 @@
+"""
+Bit-parallel truth tables: sentences compiled into flat programs over integer bit vectors.
+Bit i of every vector holds the value of a sentence in the i-th model of a block of models.
+"""
+
+BLOCK = 16
+
+CONSTANT, NOT, AND, OR, IMPLIES, IFF = range(6)
+
+
+class Program:
+    """
+    Flat list of bitwise instructions evaluating sentences over the models of a set of symbols.
+    The first registers hold the symbols, in order. Every later register holds one instruction's result.
+    """
+
+    def __init__(self, symbols):
+        self.symbols = list(symbols)
+
+        self.registers = {name: i for i, name in enumerate(self.symbols)}
+        self.instructions = list()
+
+        self.cache = dict()
+
+    def register(self, sentence):
+        """
+        Returns the register holding the value of `sentence`, compiling it if needed.
+        """
+
+        if sentence not in self.cache:
+            self.cache[sentence] = sentence.compile(self)
+
+        return self.cache[sentence]
+
+    def symbol(self, name):
+        """
+        Returns the register holding symbol `name`.
+        """
+
+        try:
+            return self.registers[name]
+        except KeyError:
+            raise Exception(f"Variable {name} not in program.")
+
+    def emit(self, op, *operands):
+        """
+        Appends an instruction and returns the register its result is stored in.
+        """
+
+        self.instructions.append((op, operands))
+
+        return len(self.symbols) + len(self.instructions) - 1
+
+    def fold(self, op, registers, empty):
+        """
+        Combines `registers` pairwise with `op`, returning a constant register when there are none.
+        """
+
+        if not registers:
+            return self.emit(CONSTANT, empty)
+
+        result = registers[0]
+
+        for register in registers[1:]:
+            result = self.emit(op, result, register)
+
+        return result
+
+    def run(self, inputs, mask):
+        """
+        Executes the program on the symbol vectors `inputs`, returning the value of every register.
+        """
+
+        values = list(inputs)
+
+        for op, operands in self.instructions:
+            if op == AND:
+                values.append(values[operands[0]] & values[operands[1]])
+            elif op == OR:
+                values.append(values[operands[0]] | values[operands[1]])
+            elif op == NOT:
+                values.append(mask ^ values[operands[0]])
+            elif op == IMPLIES:
+                values.append((mask ^ values[operands[0]]) | values[operands[1]])
+            elif op == IFF:
+                values.append(mask ^ values[operands[0]] ^ values[operands[1]])
+            else:
+                values.append(mask if operands[0] else 0)
+
+        return values
+
+    def blocks(self):
+        """
+        Yields the symbol vectors and mask of every block of models.
+        The first BLOCK symbols vary inside a block, the others are constant across it.
+        """
+
+        inner = min(len(self.symbols), BLOCK)
+
+        size = 1 << inner
+        mask = (1 << size) - 1
+
+        patterns = list()
+
+        for k in range(inner):
+            # Alternating runs of 2^k zeros and 2^k ones, doubled up to the block size
+            pattern = ((1 << (1 << k)) - 1) << (1 << k)
+            width = 1 << (k + 1)
+
+            while width < size:
+                pattern |= pattern << width
+                width <<= 1
+
+            patterns.append(pattern)
+
+        for block in range(1 << (len(self.symbols) - inner)):
+            outer = [mask if (block >> k) & 1 else 0 for k in range(len(self.symbols) - inner)]
+
+            yield patterns + outer, mask
+
+
+def compile_sentences(sentences):
+    """
+    Returns a program over every symbol of `sentences` together with the register of each sentence.
+    """
+
+    symbols = sorted(set().union(*[sentence.symbols() for sentence in sentences]))
+
+    program = Program(symbols)
+
+    return program, [program.register(sentence) for sentence in sentences]
+
+
+def entails(knowledge, query):
+    """
+    Checks if knowledge base entails query, evaluating a whole block of models per instruction.
+    """
+
+    program, (kb, q) = compile_sentences([knowledge, query])
+
+    for inputs, mask in program.blocks():
+        values = program.run(inputs, mask)
+
+        # Any model where the knowledge base holds but the query does not is a counterexample
+        if values[kb] & (mask ^ values[q]):
+            return False
+
+    return True
+
+
+def entails_all(knowledge, queries):
+    """
+    Checks which of `queries` the knowledge base entails, evaluating the knowledge base once per block.
+    """
+
+    program, registers = compile_sentences([knowledge] + list(queries))
+
+    kb = registers[0]
+
+    entailed = [True] * (len(registers) - 1)
+
+    for inputs, mask in program.blocks():
+        values = program.run(inputs, mask)
+
+        for i, q in enumerate(registers[1:]):
+            if entailed[i] and values[kb] & (mask ^ values[q]):
+                entailed[i] = False
+
+    return entailed
+
+
+def count_models(sentence):
+    """
+    Returns the number of models over the symbols of `sentence` in which it is true.
+    """
+
+    program, (register,) = compile_sentences([sentence])
+
+    return sum(program.run(inputs, mask)[register].bit_count() for inputs, mask in program.blocks())
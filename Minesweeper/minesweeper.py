@@ -1,4 +1,9 @@
 import random
+from collections import deque
+
+import numpy as np
+
+from probability import mine_probabilities
 
 
 class Minesweeper:
@@ -11,31 +16,26 @@ class Minesweeper:
         self.height = height
         self.width = width
 
-        self.mines = set()
-
         # At first, player has found no mines
         self.mines_found = set()
 
-        # Initialize an empty field with no mines
-        self.board = list()
+        # Place mines by sampling distinct cells, seeded from the random module so games stay reproducible
+        rng = np.random.default_rng(random.getrandbits(64))
 
-        for i in range(self.height):
-            row = list()
-
-            for j in range(self.width):
-                row.append(False)
+        self.board = np.zeros((height, width), dtype=bool)
+        self.board.flat[rng.choice(height * width, size=mines, replace=False)] = True
 
-            self.board.append(row)
+        self.mines = set(zip(*[axis.tolist() for axis in np.nonzero(self.board)]))
 
-        # Add mines randomly
-        while len(self.mines) != mines:
-            i = random.randrange(height)
-            j = random.randrange(width)
+        # Count the mines around every cell at once, summing the padded board shifted in all eight directions
+        padded = np.pad(self.board, 1).astype(np.uint8)
 
-            if not self.board[i][j]:
-                self.mines.add((i, j))
+        self.counts = np.zeros((height, width), dtype=np.uint8)
 
-                self.board[i][j] = True
+        for di in range(3):
+            for dj in range(3):
+                if (di, dj) != (1, 1):
+                    self.counts += padded[di:di + height, dj:dj + width]
 
     def print(self):
         """
@@ -46,7 +46,7 @@ class Minesweeper:
             print("--" * self.width + "-")
 
             for j in range(self.width):
-                if self.board[i][j]:
+                if self.board[i, j]:
                     print("|X", end="")
                 else:
                     print("| ", end="")
@@ -58,7 +58,7 @@ class Minesweeper:
     def is_mine(self, cell):
         i, j = cell
 
-        return self.board[i][j]
+        return bool(self.board[i, j])
 
     def nearby_mines(self, cell):
         """
@@ -66,22 +66,32 @@ class Minesweeper:
         not including the cell itself.
         """
 
-        # Keep count of nearby mines
-        count = 0
+        i, j = cell
+
+        return int(self.counts[i, j])
+
+    def reveal(self, cell, revealed=()):
+        """
+        Returns the safe cells uncovered by clicking on `cell`, skipping those in `revealed`.
+        A cell with no mines around it also uncovers its neighbors, flooding the whole region of such cells.
+        """
+
+        uncovered = {cell}
+        queue = deque([cell])
+
+        while queue:
+            i, j = queue.popleft()
 
-        # Loop over all cells within one row and column
-        for i in range(cell[0] - 1, cell[0] + 2):
-            for j in range(cell[1] - 1, cell[1] + 2):
-                # Ignore the cell itself
-                if (i, j) == cell:
-                    continue
+            if self.counts[i, j]:
+                continue
 
-                # Update count if cell in bounds and is mine
-                if 0 <= i < self.height and 0 <= j < self.width:
-                    if self.board[i][j]:
-                        count += 1
+            for x in range(max(i - 1, 0), min(i + 2, self.height)):
+                for y in range(max(j - 1, 0), min(j + 2, self.width)):
+                    if (x, y) not in uncovered and (x, y) not in revealed:
+                        uncovered.add((x, y))
+                        queue.append((x, y))
 
-        return count
+        return uncovered
 
     def won(self):
         """
@@ -95,47 +105,132 @@ class Sentence:
     """
     Logical statement about a Minesweeper game.
     A sentence consists of a set of board cells, and a count of the number of those cells which are mines.
+    Cells are indices i * width + j, stored as a bitmask where bit k stands for cell base + k.
+    The mask is shifted so that its lowest bit is set, keeping it small on boards of any size.
     """
 
+    __slots__ = ("base", "mask", "count")
+
     def __init__(self, cells, count):
-        self.cells = set(cells)
+        mask = 0
+
+        for cell in cells:
+            mask |= 1 << cell
+
+        self.store(0, mask)
 
         self.count = count
 
-        self.mines = set()
-        self.safes = set()
+    @classmethod
+    def from_mask(cls, base, mask, count):
+        """
+        Returns the sentence about the cells `base` + k for every bit k set in `mask`.
+        """
+
+        sentence = cls((), count)
+
+        sentence.store(base, mask)
+
+        return sentence
+
+    def store(self, base, mask):
+        """
+        Sets the cells of the sentence, moving the trailing zeros of `mask` into the base.
+        """
+
+        if mask:
+            shift = (mask & -mask).bit_length() - 1
+
+            base += shift
+            mask >>= shift
+        else:
+            base = 0
+
+        self.base = base
+        self.mask = mask
 
     def __eq__(self, other):
-        return self.cells == other.cells and self.count == other.count
+        return self.base == other.base and self.mask == other.mask and self.count == other.count
 
     def __hash__(self):
-        return hash((tuple(self.cells), self.count))
+        return hash((self.base, self.mask, self.count))
 
     def __str__(self):
-        return f"{self.cells} = {self.count}"
+        return f"{set(self)} = {self.count}"
+
+    def __len__(self):
+        return self.mask.bit_count()
+
+    def __iter__(self):
+        mask = self.mask
+
+        while mask:
+            low = mask & -mask
+
+            yield self.base + low.bit_length() - 1
+
+            mask ^= low
+
+    def __contains__(self, cell):
+        return cell >= self.base and (self.mask >> (cell - self.base)) & 1 == 1
+
+    @property
+    def cells(self):
+        return set(self)
+
+    def subset(self, other):
+        """
+        Checks if the cells of this sentence are a proper subset of the cells of `other`.
+        """
+
+        if not self.mask:
+            return bool(other.mask)
+
+        shift = self.base - other.base
+
+        if shift < 0:
+            return False
+
+        mask = self.mask << shift
+
+        return mask != other.mask and mask & other.mask == mask
+
+    def difference(self, other):
+        """
+        Returns the sentence about the cells of this sentence that are not in `other`,
+        holding the mines this sentence has beyond those of `other`.
+        """
+
+        shift = other.base - self.base
+
+        if shift >= 0:
+            mask = self.mask & ~(other.mask << shift)
+        else:
+            mask = self.mask & ~(other.mask >> -shift)
+
+        return Sentence.from_mask(self.base, mask, self.count - other.count)
 
     def known_mines(self):
         """
         Returns the set of all cells in self.cells known to be mines.
         """
 
-        return self.mines
+        return self.cells if self.count == len(self) else set()
 
     def known_safes(self):
         """
         Returns the set of all cells in self.cells known to be safe.
         """
 
-        return self.safes
+        return self.cells if self.count == 0 else set()
 
     def mark_mine(self, cell):
         """
         Updates internal knowledge representation given the fact that a cell is known to be a mine.
         """
 
-        if cell in self.cells:
-            self.cells.remove(cell)
-            self.mines.add(cell)
+        if cell in self:
+            self.store(self.base, self.mask & ~(1 << (cell - self.base)))
 
             self.count -= 1
 
@@ -144,9 +239,8 @@ class Sentence:
         Updates internal knowledge representation given the fact that a cell is known to be safe.
         """
 
-        if cell in self.cells:
-            self.cells.remove(cell)
-            self.safes.add(cell)
+        if cell in self:
+            self.store(self.base, self.mask & ~(1 << (cell - self.base)))
 
 
 class MinesweeperAI:
@@ -154,11 +248,13 @@ class MinesweeperAI:
     Minesweeper game player.
     """
 
-    def __init__(self, height=8, width=8):
-        # Set initial height and width
+    def __init__(self, height=8, width=8, mines=8):
+        # Set initial height and width, and the number of mines hidden on the board
         self.height = height
         self.width = width
 
+        self.mine_count = mines
+
         # Keep track of which cells have been clicked on
         self.moves_made = set()
 
@@ -166,32 +262,132 @@ class MinesweeperAI:
         self.mines = set()
         self.safes = set()
 
+        # Known safe cells that have not been clicked on yet
+        self.safe_moves = set()
+
         # Set of sentences about the game known to be true
         self.knowledge = set()
 
+        # Sentences containing each cell position, and sentences whose consequences are still to be drawn
+        self.index = dict()
+        self.queue = deque()
+
+    def position(self, cell):
+        """
+        Returns the index of a cell in the row-major order sentences use.
+        """
+
+        i, j = cell
+
+        return i * self.width + j
+
+    def locate(self, position):
+        """
+        Returns the cell at a row-major index.
+        """
+
+        return divmod(position, self.width)
+
     def mark_mine(self, cell):
         """
         Marks a cell as a mine, and updates all knowledge to mark that cell as a mine as well.
         """
 
-        self.mines.add(cell)
+        if cell in self.mines:
+            return
 
-        self.moves_made.add(cell)
+        self.mines.add(cell)
 
-        for sentence in self.knowledge:
-            sentence.mark_mine(cell)
+        self.update(cell, Sentence.mark_mine)
 
     def mark_safe(self, cell):
         """
         Marks a cell as safe, and updates all knowledge to mark that cell as safe as well.
         """
 
+        if cell in self.safes:
+            return
+
         self.safes.add(cell)
 
-        self.moves_made.add(cell)
+        if cell not in self.moves_made:
+            self.safe_moves.add(cell)
+
+        self.update(cell, Sentence.mark_safe)
+
+    def update(self, cell, mark):
+        """
+        Applies `mark` to the sentences containing `cell`, queueing them again since they changed.
+        """
+
+        position = self.position(cell)
+
+        for sentence in list(self.index.get(position, ())):
+            # Sentences are hashed by content, so they leave every set before changing
+            self.remove(sentence)
+
+            mark(sentence, position)
+
+            self.insert(sentence)
+
+    def insert(self, sentence):
+        """
+        Adds a sentence to the knowledge base and queues it, unless it is empty or already known.
+        """
+
+        if not sentence.mask or sentence in self.knowledge:
+            return
+
+        self.knowledge.add(sentence)
+
+        for cell in sentence:
+            self.index.setdefault(cell, set()).add(sentence)
+
+        self.queue.append(sentence)
+
+    def remove(self, sentence):
+        """
+        Removes a sentence from the knowledge base and from the index of its cells.
+        """
+
+        self.knowledge.discard(sentence)
+
+        for cell in sentence:
+            sentences = self.index[cell]
+
+            sentences.discard(sentence)
+
+            if not sentences:
+                del self.index[cell]
+
+    def propagate(self):
+        """
+        Draws conclusions from queued sentences until no sentence is left to examine.
+        Only sentences that changed, or were just inferred, are examined again.
+        """
+
+        while self.queue:
+            sentence = self.queue.popleft()
+
+            # Skip sentences dropped or already resolved since they were queued
+            if sentence not in self.knowledge:
+                continue
 
-        for sentence in self.knowledge:
-            sentence.mark_safe(cell)
+            if sentence.count == 0:
+                for position in list(sentence):
+                    self.mark_safe(self.locate(position))
+            elif sentence.count == len(sentence):
+                for position in list(sentence):
+                    self.mark_mine(self.locate(position))
+            else:
+                # Only sentences sharing a cell can be a subset or superset of this one
+                related = set().union(*[self.index[position] for position in sentence])
+
+                for other in related:
+                    if other.subset(sentence):
+                        self.insert(sentence.difference(other))
+                    elif sentence.subset(other):
+                        self.insert(other.difference(sentence))
 
     def add_knowledge(self, cell, count):
         """
@@ -199,13 +395,15 @@ class MinesweeperAI:
         how many neighboring cells have mines in them.
         """
 
-        # Add cell to safe cells
-        self.safes.add(cell)
-
         # Mark cell as a move that's been made
         self.moves_made.add(cell)
 
-        # Add new sentence to AI knowledge base
+        self.safe_moves.discard(cell)
+
+        # Add cell to safe cells
+        self.mark_safe(cell)
+
+        # Add new sentence about the neighbors whose state is still unknown
         cells = list()
 
         x, y = cell
@@ -213,40 +411,15 @@ class MinesweeperAI:
         for i in range(x - 1, x + 2):
             for j in range(y - 1, y + 2):
                 if 0 <= i < self.height and 0 <= j < self.width and (i, j) != cell:
-                    cells.append((i, j))
-
-        self.knowledge.add(Sentence(cells, count))
-
-        for sentence in self.knowledge:
-            sentence.mark_safe(cell)
-
-        # Mark additional cells as safe or mines
-        for sentence in self.knowledge:
-            if sentence.count == len(sentence.cells):
-                for cell in sentence.cells:
-                    self.mines.add(cell)
-            if sentence.count == 0:
-                for cell in sentence.cells:
-                    self.safes.add(cell)
-
-        for mine in self.mines:
-            for sentence in self.knowledge:
-                sentence.mark_mine(mine)
+                    if (i, j) in self.mines:
+                        count -= 1
+                    elif (i, j) not in self.safes:
+                        cells.append(self.position((i, j)))
 
-        for safe in self.safes:
-            for sentence in self.knowledge:
-                sentence.mark_safe(safe)
+        self.insert(Sentence(cells, count))
 
-        # Adding knowledge to base based on other knowledge
-        sentences = list()
-
-        for x in self.knowledge:
-            for y in self.knowledge:
-                if x != y and y.cells.issubset(x.cells):
-                    sentences.append(Sentence(x.cells.difference(y.cells), x.count - y.count))
-
-        for sentence in sentences:
-            self.knowledge.add(sentence)
+        # Mark additional cells as safe or mines, and infer new sentences
+        self.propagate()
 
     def make_safe_move(self):
         """
@@ -256,24 +429,51 @@ class MinesweeperAI:
         but should not modify any of those values.
         """
 
-        for i, j in self.safes:
-            if (i, j) not in self.moves_made:
-                return i, j
+        for cell in self.safe_moves:
+            return cell
 
         return None
 
     def make_random_move(self):
         """
-        Returns a move to make on the Minesweeper board.
+        Returns a move to make on the Minesweeper board when no move is known to be safe:
+        the unknown cell least likely to be a mine.
         """
 
-        options = list()
+        for cell in self.safe_moves:
+            return cell
+
+        unknown = self.height * self.width - len(self.moves_made) - len(self.mines)
+
+        if unknown <= 0:
+            return None
+
+        frontier, interior = mine_probabilities(self.knowledge, unknown, self.mine_count - len(self.mines))
+
+        best = min(frontier, key=frontier.get) if frontier else None
+
+        if interior is not None and (best is None or interior < frontier[best]):
+            return self.interior_cell(frontier)
 
-        forbidden = self.mines.union(self.moves_made)
+        return None if best is None else self.locate(best)
+
+    def interior_cell(self, frontier):
+        """
+        Returns a random unknown cell that no sentence mentions, `frontier` holding the positions of those that do.
+        """
+
+        # Unknown cells are usually plentiful, so a few random draws avoid listing the whole board
+        for _ in range(64):
+            cell = (random.randrange(self.height), random.randrange(self.width))
+
+            if cell not in self.moves_made and cell not in self.mines and self.position(cell) not in frontier:
+                return cell
+
+        options = list()
 
         for i in range(self.height):
             for j in range(self.width):
-                if (i, j) not in forbidden:
+                if (i, j) not in self.moves_made and (i, j) not in self.mines and self.position((i, j)) not in frontier:
                     options.append((i, j))
 
-        return random.choice(options) if options else None
+        return random.choice(options)
@@ -0,0 +1,341 @@
+"""
+Mine probabilities for the unknown cells of a Minesweeper board, given the sentences known about it.
+"""
+
+import random
+import time
+
+# Components with more cells than this are sampled instead of enumerated
+LIMIT = 40
+
+# Seconds shared by the components that have to be sampled
+BUDGET = 0.05
+
+
+class Component:
+    """
+    Group of frontier cells tied together by sentences, independent from every other group
+    except through the total number of mines left on the board.
+    """
+
+    def __init__(self, cells, sentences):
+        self.cells = cells
+
+        self.counts = [sentence.count for sentence in sentences]
+
+        # Sentences constraining each cell, by position
+        position = {cell: i for i, cell in enumerate(cells)}
+
+        self.constraints = [list() for _ in cells]
+
+        for k, sentence in enumerate(sentences):
+            for cell in sentence:
+                self.constraints[position[cell]].append(k)
+
+        # Mines placed and cells left unassigned in each sentence
+        self.mines = [0] * len(sentences)
+        self.left = [len(sentence) for sentence in sentences]
+
+        self.assignment = [0] * len(cells)
+
+    def assign(self, i, value):
+        """
+        Assigns `value` to the i-th cell, returning False if some sentence can no longer be satisfied.
+        """
+
+        consistent = True
+
+        for k in self.constraints[i]:
+            self.left[k] -= 1
+            self.mines[k] += value
+
+            if self.mines[k] > self.counts[k] or self.mines[k] + self.left[k] < self.counts[k]:
+                consistent = False
+
+        self.assignment[i] = value
+
+        return consistent
+
+    def unassign(self, i, value):
+        """
+        Undoes the assignment of `value` to the i-th cell.
+        """
+
+        for k in self.constraints[i]:
+            self.left[k] += 1
+            self.mines[k] -= value
+
+        self.assignment[i] = 0
+
+    def record(self, totals, hits):
+        """
+        Adds the current complete assignment to the solution tallies.
+        """
+
+        k = sum(self.assignment)
+
+        totals[k] = totals.get(k, 0) + 1
+
+        row = hits.setdefault(k, [0] * len(self.cells))
+
+        for i, value in enumerate(self.assignment):
+            row[i] += value
+
+    def backtrack(self, order, totals, hits, first=False, deadline=None):
+        """
+        Walks the assignments of mines to the cells depth first, trying for the i-th cell the values in `order(i)`
+        from last to first, and tallies every assignment satisfying all sentences, stopping after one if `first`.
+        The stack holds the index of each cell on the current path with the values left to try for it,
+        so components of any size fit within the recursion limit.
+        Returns True if it stopped after a solution, False once the walk is done, and None if `deadline` passes first.
+        """
+
+        last = len(self.cells) - 1
+
+        stack = [(0, order(0))]
+
+        result = False
+
+        while stack:
+            if deadline is not None and time.perf_counter() >= deadline:
+                result = None
+
+                break
+
+            i, values = stack[-1]
+
+            # Every value of the cell tried: go back to the previous cell and take its value back
+            if not values:
+                stack.pop()
+
+                if stack:
+                    j = stack[-1][0]
+
+                    self.unassign(j, self.assignment[j])
+
+                continue
+
+            value = values.pop()
+
+            consistent = self.assign(i, value)
+
+            if consistent and i < last:
+                stack.append((i + 1, order(i + 1)))
+
+                continue
+
+            if consistent:
+                self.record(totals, hits)
+
+                if first:
+                    result = True
+
+            self.unassign(i, value)
+
+            if result:
+                break
+
+        # Take back the values still assigned on the path when stopping early
+        for j, _ in stack[:-1]:
+            self.unassign(j, self.assignment[j])
+
+        return result
+
+    def enumerate(self):
+        """
+        Counts every assignment of mines to the cells satisfying all sentences, by backtracking.
+        Returns, for each number of mines k, the number of solutions with k mines,
+        and for each cell the number of those solutions with a mine in it.
+        """
+
+        totals = dict()
+        hits = dict()
+
+        self.backtrack(lambda i: [1, 0], totals, hits)
+
+        return totals, hits
+
+    def sample(self, deadline, rng=random):
+        """
+        Estimates the tallies of `enumerate` from solutions found by randomized backtracking until `deadline`.
+        The estimate is approximate: every solution found counts once, and the tallies are empty if none is found in time.
+        """
+
+        totals = dict()
+        hits = dict()
+
+        while self.backtrack(lambda i: rng.sample((0, 1), 2), totals, hits, first=True, deadline=deadline):
+            pass
+
+        return totals, hits
+
+
+def components(sentences):
+    """
+    Splits the cells of `sentences` into components, returning a list of (cells, sentences) pairs.
+    Cells are listed in the order a breadth-first walk over the sentences meets them,
+    so that sentences are closed early during backtracking.
+    """
+
+    containing = dict()
+
+    for sentence in sentences:
+        for cell in sentence:
+            containing.setdefault(cell, list()).append(sentence)
+
+    seen = set()
+    result = list()
+
+    for start in containing:
+        if start in seen:
+            continue
+
+        seen.add(start)
+
+        cells = [start]
+        group = list()
+        visited = set()
+
+        # Cells are appended while they are walked, so the list doubles as the queue
+        for cell in cells:
+            for sentence in containing[cell]:
+                if id(sentence) in visited:
+                    continue
+
+                visited.add(id(sentence))
+                group.append(sentence)
+
+                for other in sentence:
+                    if other not in seen:
+                        seen.add(other)
+                        cells.append(other)
+
+        result.append((cells, group))
+
+    return result
+
+
+def convolve(a, b):
+    """
+    Combines two distributions of solution counts by number of mines.
+    """
+
+    result = dict()
+
+    for i, x in a.items():
+        for j, y in b.items():
+            result[i + j] = result.get(i + j, 0) + x * y
+
+    return result
+
+
+def scaled_binomials(interior, mines, distribution):
+    """
+    Returns, for every number of frontier mines k in `distribution`, the number of ways
+    to place the other mines - k mines among `interior` cells, all multiplied by one common factor.
+    Only ratios matter, and the factor keeps the numbers far smaller than the binomials themselves.
+    """
+
+    low = max(0, mines - max(distribution))
+    high = min(interior, mines - min(distribution))
+
+    if low > high:
+        return dict()
+
+    # C(interior, n) * high! * (interior - low)! / interior! is the product of these two terms
+    upper = {high: 1}
+
+    for n in range(high - 1, low - 1, -1):
+        upper[n] = upper[n + 1] * (n + 1)
+
+    lower = {low: 1}
+
+    for n in range(low + 1, high + 1):
+        lower[n] = lower[n - 1] * (interior - n + 1)
+
+    return {mines - n: upper[n] * lower[n] for n in range(low, high + 1)}
+
+
+def mine_probabilities(sentences, unknown, mines, budget=BUDGET, rng=random):
+    """
+    Returns the probability that each cell of `sentences` is a mine,
+    and the probability for any other unknown cell, or None if there is none.
+    `unknown` is the number of cells whose state is unknown, and `mines` the number of mines among them.
+    Cells are the positions sentences use. Every configuration of mines consistent with the sentences is equally likely.
+    """
+
+    sentences = [sentence for sentence in sentences if len(sentence)]
+
+    parts = [(cells, Component(cells, group)) for cells, group in components(sentences)]
+
+    # Enumerate small components exactly, and share the time budget among the others
+    oversized = sum(len(cells) > LIMIT for cells, _ in parts)
+
+    start = time.perf_counter()
+
+    tallies = list()
+    sampled = 0
+
+    for cells, component in parts:
+        if len(cells) <= LIMIT:
+            tallies.append(component.enumerate())
+        else:
+            sampled += 1
+
+            tallies.append(component.sample(start + budget * sampled / oversized, rng))
+
+    # Components sampled without a solution in time tell nothing, so their cells count as interior cells
+    kept = [k for k, (totals, _) in enumerate(tallies) if totals]
+
+    parts = [parts[k] for k in kept]
+    tallies = [tallies[k] for k in kept]
+
+    interior = unknown - sum(len(cells) for cells, _ in parts)
+
+    # Distribution of frontier mines over the components before and after each one
+    prefixes = [{0: 1}]
+
+    for totals, _ in tallies:
+        prefixes.append(convolve(prefixes[-1], totals))
+
+    suffixes = [{0: 1}]
+
+    for totals, _ in reversed(tallies):
+        suffixes.append(convolve(suffixes[-1], totals))
+
+    suffixes.reverse()
+
+    weights = scaled_binomials(interior, mines, prefixes[-1])
+
+    def weight(k):
+        return weights.get(k, 0)
+
+    total = sum(count * weight(k) for k, count in prefixes[-1].items())
+
+    # Knowledge inconsistent with the mine count: fall back to ignoring the count
+    if not total:
+        weights = {k: 1 for k in prefixes[-1]}
+
+        total = sum(prefixes[-1].values())
+
+    probabilities = dict()
+
+    for i, (cells, _) in enumerate(parts):
+        totals, hits = tallies[i]
+
+        others = convolve(prefixes[i], suffixes[i + 1])
+
+        for k in totals:
+            scale = sum(count * weight(k + other) for other, count in others.items())
+
+            for cell, hit in zip(cells, hits[k]):
+                probabilities[cell] = probabilities.get(cell, 0) + hit * scale
+
+    probabilities = {cell: numerator / total for cell, numerator in probabilities.items()}
+
+    if interior <= 0:
+        return probabilities, None
+
+    expected = sum(count * weight(k) * max(mines - k, 0) for k, count in prefixes[-1].items())
+
+    return probabilities, min(expected / total / interior, 1.0)
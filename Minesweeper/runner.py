@@ -47,7 +47,7 @@ mine = pygame.transform.scale(mine, (cell_size, cell_size))
 # Create game and AI agent
 game = Minesweeper(height=HEIGHT, width=WIDTH, mines=MINES)
 
-ai = MinesweeperAI(height=HEIGHT, width=WIDTH)
+ai = MinesweeperAI(height=HEIGHT, width=WIDTH, mines=MINES)
 
 # Keep track of revealed cells, flagged cells, and if a mine was hit
 revealed = set()
@@ -236,7 +236,7 @@ while True:
         elif reset_button.collidepoint(x, y):
             game = Minesweeper(HEIGHT, WIDTH, MINES)
 
-            ai = MinesweeperAI(HEIGHT, WIDTH)
+            ai = MinesweeperAI(HEIGHT, WIDTH, MINES)
 
             revealed = set()
             flags = set()
@@ -258,10 +258,10 @@ while True:
         if game.is_mine(move):
             lost = True
         else:
-            nearby = game.nearby_mines(move)
+            # Cells with no mines around them open up their neighbors as well
+            for cell in game.reveal(move, revealed | flags):
+                revealed.add(cell)
 
-            revealed.add(move)
-
-            ai.add_knowledge(move, nearby)
+                ai.add_knowledge(cell, game.nearby_mines(cell))
 
     pygame.display.flip()
@@ -0,0 +1,121 @@
+"""
+Play seeded Minesweeper games between the game and the AI without a display, across a pool of processes.
+"""
+
+import argparse
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from minesweeper import Minesweeper, MinesweeperAI
+
+GAMES = 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Minesweeper AI on headless seeded games.")
+
+    parser.add_argument("--games", type=int, default=GAMES, help="number of games to play")
+    parser.add_argument("--height", type=int, default=8, help="board height")
+    parser.add_argument("--width", type=int, default=8, help="board width")
+    parser.add_argument("--mines", type=int, default=8, help="number of mines on the board")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes, defaults to one per CPU")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first game, later games count up from it")
+
+    args = parser.parse_args()
+
+    if not 0 < args.mines < args.height * args.width:
+        parser.error("mines must leave at least one safe cell on the board")
+
+    start = time.perf_counter()
+
+    results = simulate(args.games, args.height, args.width, args.mines, args.workers, args.seed)
+
+    seconds = time.perf_counter() - start
+
+    report(results, seconds)
+
+
+def play(height, width, mines, seed):
+    """
+    Plays one game with every random choice seeded by `seed`, until the AI hits a mine or reveals every safe cell.
+    Returns whether the AI won, the time it took for each move, and the largest size its knowledge base reached.
+    """
+
+    random.seed(seed)
+
+    game = Minesweeper(height=height, width=width, mines=mines)
+    ai = MinesweeperAI(height=height, width=width, mines=mines)
+
+    latencies = list()
+    knowledge = 0
+
+    while len(ai.moves_made) < height * width - mines:
+        # Time the AI's choice together with the inference that follows it
+        start = time.perf_counter()
+
+        move = ai.make_safe_move()
+
+        if move is None:
+            move = ai.make_random_move()
+
+        if move is None or game.is_mine(move):
+            latencies.append(time.perf_counter() - start)
+
+            return {'won': False, 'latencies': latencies, 'knowledge': knowledge}
+
+        ai.add_knowledge(move, game.nearby_mines(move))
+
+        latencies.append(time.perf_counter() - start)
+
+        knowledge = max(knowledge, len(ai.knowledge))
+
+    return {'won': True, 'latencies': latencies, 'knowledge': knowledge}
+
+
+def simulate(games, height, width, mines, workers=None, seed=0):
+    """
+    Plays `games` games seeded `seed`, `seed` + 1, ... across a pool of `workers` processes, keeping their order.
+    """
+
+    seeds = range(seed, seed + games)
+
+    chunksize = max(1, games // (4 * (workers or os.cpu_count() or 1)))
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(
+            play, [height] * games, [width] * games, [mines] * games, seeds, chunksize=chunksize
+        ))
+
+
+def percentile(values, fraction):
+    """
+    Returns the nearest-rank percentile of sorted `values`.
+    """
+
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def report(results, seconds):
+    """
+    Prints the win rate, throughput, move latency and knowledge base size over all `results`.
+    """
+
+    wins = sum(result['won'] for result in results)
+
+    latencies = sorted(latency for result in results for latency in result['latencies'])
+
+    knowledge = [result['knowledge'] for result in results]
+
+    print(f"Games:      {len(results)} in {seconds:.2f}s, {len(results) / seconds:.1f} games/s")
+    print(f"Win rate:   {wins / len(results):.2%} ({wins} won)")
+    print(f"Moves:      {len(latencies)}, {len(latencies) / sum(latencies):.0f} moves/s per worker")
+    print("Latency:    " + ", ".join(
+        f"p{round(fraction * 100)} {percentile(latencies, fraction) * 1e3:.3f}ms" for fraction in (.5, .9, .99)
+    ) + f", max {latencies[-1] * 1e3:.3f}ms")
+    print(f"Knowledge:  {sum(knowledge) / len(knowledge):.1f} sentences at peak on average, {max(knowledge)} at most")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""
+Checks the mine probabilities on chains of sentences, where every run of three cells holds exactly one mine.
+"""
+
+import random
+import time
+
+from minesweeper import Sentence
+from probability import LIMIT, Component, components, mine_probabilities
+
+
+def chain(length):
+    """
+    Returns the sentences of a chain of `length` cells with one mine in every three consecutive cells.
+    """
+
+    return [Sentence([k, k + 1, k + 2], 1) for k in range(length - 2)]
+
+
+def test_enumerate_counts_every_solution():
+    cells, group = components(chain(12))[0]
+
+    totals, hits = Component(cells, group).enumerate()
+
+    # A mine every third cell, starting from any of the first three
+    assert totals == {4: 3}
+    assert sorted(hits[4]) == [1] * 12
+
+
+def test_oversized_component_is_sampled_within_budget():
+    length = 3000
+
+    assert length > LIMIT
+
+    start = time.perf_counter()
+
+    probabilities, interior = mine_probabilities(chain(length), length + 1000, length // 3 + 100, 0.5, random.Random(0))
+
+    seconds = time.perf_counter() - start
+
+    assert seconds < 5
+    assert all(0 <= p <= 1 for p in probabilities.values())
+    assert interior is not None and 0 <= interior <= 1
@@ -74,6 +74,7 @@ class NimAI:
     def __init__(self, alpha=0.5, epsilon=0.1):
         """
         Initialize AI with an empty Q-learning dictionary, an alpha (learning) rate, and an epsilon rate.
+        The dictionary maps each state, as a tuple, to a dictionary of the Q-values of the actions taken in it.
         """
 
         self.q = dict()
@@ -98,7 +99,7 @@ class NimAI:
         Return the Q-value for the state and the action.
         """
 
-        return self.q.get((tuple(state), action), 0)
+        return self.q.get(tuple(state), dict()).get(action, 0)
 
     def update_q_value(self, state, action, old_q, reward, future_rewards):
         """
@@ -106,23 +107,17 @@ class NimAI:
         and an estimate of future rewards.
         """
 
-        self.q[tuple(state), action] = old_q + self.alpha * ((reward + future_rewards) - old_q)
+        self.q.setdefault(tuple(state), dict())[action] = old_q + self.alpha * ((reward + future_rewards) - old_q)
 
     def best_future_reward(self, state):
         """
         Given a state, consider all possible pairs available and return the maximum of all of their Q-values.
         """
 
-        state = tuple(state)
+        # Only the Q-values of this state are looked at, unknown actions counting as 0
+        values = self.q.get(tuple(state))
 
-        result = 0
-
-        # Iterating through Q dictionary to find the highest reward value
-        for (i, j), reward in self.q.items():
-            if i == state:
-                result = max(result, reward)
-
-        return result
+        return max(0, max(values.values())) if values else 0
 
     def choose_action(self, state, epsilon=True):
         """
@@ -145,14 +140,14 @@ class NimAI:
         # Starting with empty action and max value
         action, maximum = tuple(), 0
 
-        # Converting state list to tuple
-        state = tuple(state)
+        # Q-values of the actions already taken in this state
+        values = self.q.get(tuple(state), dict())
 
         # Iterating through actions
         for move in actions:
             # Checking for key existence
             try:
-                reward = self.q[state, move]
+                reward = values[move]
             except KeyError:
                 continue
             
@@ -165,56 +160,67 @@ class NimAI:
         return action if action else random.choice(list(actions))
 
 
-def train(n):
+def train(n, ai=None, verbose=True, initial=None):
     """
-    Train an AI by playing games against itself.
+    Train an AI by playing games against itself from piles `initial`, a new NimAI unless `ai` is given.
+    Prints a line per game unless `verbose` is False.
     """
 
-    player = NimAI()
+    player = NimAI() if ai is None else ai
 
     # Play games
     for i in range(n):
-        print(f"Playing training game {i + 1}...")
+        if verbose:
+            print(f"Playing training game {i + 1}...")
 
-        game = Nim()
+        episode(player, initial)
 
-        # Keep track of last move made by either player
-        last = {
-            0: {"state": None, "action": None},
-            1: {"state": None, "action": None}
-        }
+    if verbose:
+        print("Done training.")
 
-        # Game loop
-        while True:
-            # Keep track of current state and action
-            state = game.piles.copy()
+    # Return the trained AI
+    return player
 
-            action = player.choose_action(game.piles)
 
-            # Keep track of last state and action
-            last[game.player]["state"] = state
-            last[game.player]["action"] = action
+def episode(player, initial=None):
+    """
+    Play one training game of the AI against itself from piles `initial`, updating its Q-values.
+    """
 
-            # Make move
-            game.move(action)
+    game = Nim(initial)
 
-            new_state = game.piles.copy()
+    # Keep track of last move made by either player
+    last = {
+        0: {"state": None, "action": None},
+        1: {"state": None, "action": None}
+    }
 
-            # When game is over, update Q values with rewards
-            if game.winner is not None:
-                player.update(state, action, new_state, -1)
+    # Game loop
+    while True:
+        # Keep track of current state and action
+        state = game.piles.copy()
 
-                player.update(last[game.player]["state"], last[game.player]["action"], new_state, 1)
+        action = player.choose_action(game.piles)
 
-                break
-            # If game is continuing, no rewards yet
-            elif last[game.player]["state"] is not None:
-                player.update(last[game.player]["state"], last[game.player]["action"], new_state, 0)
+        # Keep track of last state and action
+        last[game.player]["state"] = state
+        last[game.player]["action"] = action
 
-    print("Done training.")
+        # Make move
+        game.move(action)
 
-    # Return the trained AI
-    return player
+        new_state = game.piles.copy()
+
+        # When game is over, update Q values with rewards
+        if game.winner is not None:
+            player.update(state, action, new_state, -1)
+
+            player.update(last[game.player]["state"], last[game.player]["action"], new_state, 1)
+
+            break
+        # If game is continuing, no rewards yet
+        elif last[game.player]["state"] is not None:
+            player.update(last[game.player]["state"], last[game.player]["action"], new_state, 0)
 
 
 def play(ai, human_player=None):
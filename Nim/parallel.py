@@ -0,0 +1,170 @@
+"""
+Nim training that plays self-play games across a pool of processes, each on its own copy of the Q-table,
+merging the copies into a master table after every round, and a benchmark comparing it with serial training.
+"""
+
+import argparse
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import reduce
+from operator import xor
+
+import numpy as np
+
+from nim import train, episode
+from qtable import ArrayNimAI
+
+# Games each worker plays between merges
+BATCH = 250
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare serial and parallel self-play training of the Nim AI.")
+
+    parser.add_argument("--games", type=int, default=10000, help="number of training games")
+    parser.add_argument("--batch", type=int, default=BATCH, help="games each worker plays between merges")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes, defaults to one per CPU")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the training games")
+
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+
+    start = time.perf_counter()
+
+    ai = train(args.games, ArrayNimAI(), verbose=False)
+
+    report("serial", args.games, time.perf_counter() - start, ai)
+
+    start = time.perf_counter()
+
+    ai = parallel_train(args.games, args.batch, args.workers, args.seed)
+
+    report("parallel", args.games, time.perf_counter() - start, ai)
+
+
+def report(name, games, seconds, ai):
+    """
+    Prints the speed of a training run and the accuracy of the policy it learned.
+    """
+
+    print(f"{name:>8}: {games} games in {seconds:.2f}s, {games / seconds:.0f} games/s, accuracy {accuracy(ai):.1%}")
+
+
+def winning(piles):
+    """
+    Returns True if the player to move wins with perfect play, taking the last object losing the game.
+    """
+
+    # Once no pile holds more than one object, moves alternate and the player left with an odd count loses
+    if max(piles) <= 1:
+        return sum(piles) % 2 == 0
+
+    return reduce(xor, piles) != 0
+
+
+def accuracy(ai):
+    """
+    Returns the fraction of won positions in which the AI's greedy action keeps the win.
+    """
+
+    policy = ai.policy()
+
+    won = right = 0
+
+    for row, column in enumerate(policy):
+        piles = [row // stride % (pile + 1) for stride, pile in zip(ai.strides, ai.initial)]
+
+        if not any(piles) or not winning(piles):
+            continue
+
+        won += 1
+
+        if column >= 0:
+            i, j = ai.moves[column]
+
+            piles[i] -= j
+
+            right += not winning(piles)
+
+    return right / won
+
+
+def play_batch(buffer, initial, games, alpha, epsilon, seed):
+    """
+    Plays `games` self-play games from piles `initial`, seeded by `seed`,
+    on a copy of the Q-table stored in `buffer`, in a worker process.
+    Returns the trained Q-values and how many updates each received.
+    """
+
+    random.seed(seed)
+
+    ai = ArrayNimAI.from_bytes(buffer, initial, alpha, epsilon)
+
+    for _ in range(games):
+        episode(ai, ai.initial)
+
+    return ai.q, ai.visits
+
+
+def merge(ai, results):
+    """
+    Sets every Q-value of the master `ai` that a worker updated to the average of the workers' values,
+    weighted by how many updates each worker made to it.
+    """
+
+    weights = sum(visits for _, visits in results)
+
+    total = sum(np.where(visits > 0, q, 0) * visits for q, visits in results)
+
+    updated = weights > 0
+
+    ai.q[updated] = total[updated] / weights[updated]
+    ai.visits += weights
+
+
+def parallel_train(n, batch=BATCH, workers=None, seed=0, ai=None):
+    """
+    Trains an AI, a new ArrayNimAI unless `ai` is given, on `n` self-play games across a pool of `workers` processes.
+    Every round, each worker plays up to `batch` games on a copy of the master table, and the copies are merged back.
+    Prints the progress and speed on a single line.
+    """
+
+    player = ArrayNimAI() if ai is None else ai
+
+    workers = workers or os.cpu_count() or 1
+
+    start = time.perf_counter()
+
+    played = 0
+    rounds = 0
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        while played < n:
+            sizes = [min(batch, max(0, n - played - k * batch)) for k in range(workers)]
+
+            buffer = player.to_bytes()
+
+            futures = [
+                executor.submit(
+                    play_batch, buffer, player.initial, size, player.alpha, player.epsilon, seed + rounds * workers + k
+                )
+                for k, size in enumerate(sizes) if size
+            ]
+
+            merge(player, [future.result() for future in futures])
+
+            played += sum(sizes)
+            rounds += 1
+
+            print(f"\rTrained {played}/{n} games, {played / (time.perf_counter() - start):.0f} games/s", end="", flush=True)
+
+    print()
+
+    return player
+
+
+if __name__ == "__main__":
+    main()
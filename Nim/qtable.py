@@ -0,0 +1,160 @@
+"""
+Nim AI whose Q-values live in a dense NumPy array, indexed by integer encodings of states and actions.
+"""
+
+import random
+
+import numpy as np
+
+
+class ArrayNimAI:
+    def __init__(self, initial=None, alpha=0.5, epsilon=0.1):
+        """
+        Initialize AI with an empty Q-table for games starting from piles `initial`,
+        an alpha (learning) rate, and an epsilon rate.
+        """
+
+        if initial is None:
+            initial = [1, 3, 5, 7]
+
+        self.initial = list(initial)
+
+        # Mixed-radix state encoding: pile i holds 0 to initial[i] objects and weighs strides[i] in the index
+        self.strides = list()
+
+        size = 1
+
+        for pile in self.initial:
+            self.strides.append(size)
+
+            size *= pile + 1
+
+        # Actions (i, j) in column order, and the column of each
+        self.moves = [(i, j) for i, pile in enumerate(self.initial) for j in range(1, pile + 1)]
+        self.columns = {move: k for k, move in enumerate(self.moves)}
+
+        # Actions available in each state: taking j from pile i needs at least j objects there
+        piles = np.arange(size)[:, None] // np.array(self.strides) % (np.array(self.initial) + 1)
+
+        taken = np.array([j for _, j in self.moves])
+        source = np.array([i for i, _ in self.moves])
+
+        self.legal = piles[:, source] >= taken
+
+        self.available = [[self.moves[k] for k in np.flatnonzero(legal)] for legal in self.legal]
+
+        # Q-values by state and action, -inf for actions never taken, which illegal actions never are
+        self.q = np.full((size, len(self.moves)), -np.inf)
+
+        # Updates made to each Q-value, to weigh tables trained apart when merging them
+        self.visits = np.zeros(self.q.shape, dtype=np.int64)
+
+        self.alpha = alpha
+        self.epsilon = epsilon
+
+    def encode(self, state):
+        """
+        Returns the row of the Q-table for a list of piles.
+        """
+
+        row = 0
+
+        for pile, stride in zip(state, self.strides):
+            row += pile * stride
+
+        return row
+
+    def update(self, old_state, action, new_state, reward):
+        """
+        Update Q-learning model, given an old state, an action taken in that state, a new resulting state,
+        and the reward received from taking that action.
+        """
+
+        old = self.get_q_value(old_state, action)
+
+        best_future = self.best_future_reward(new_state)
+
+        self.update_q_value(old_state, action, old, reward, best_future)
+
+    def get_q_value(self, state, action):
+        """
+        Return the Q-value for the state and the action.
+        """
+
+        value = self.q.item(self.encode(state), self.columns[action])
+
+        return 0 if value == -np.inf else value
+
+    def update_q_value(self, state, action, old_q, reward, future_rewards):
+        """
+        Update the Q-value for the state and the action given the previous Q-value, a current reward,
+        and an estimate of future rewards.
+        """
+
+        row = self.encode(state)
+        column = self.columns[action]
+
+        self.q[row, column] = old_q + self.alpha * ((reward + future_rewards) - old_q)
+        self.visits[row, column] += 1
+
+    def best_future_reward(self, state):
+        """
+        Given a state, return the highest Q-value of the actions taken in it, or 0 if that is larger.
+        """
+
+        return max(0, self.q[self.encode(state)].max().item())
+
+    def choose_action(self, state, epsilon=True):
+        """
+        Given a state, return an action to take.
+        """
+
+        # Probability of True is `self.epsilon` and False is `1 - self.epsilon`
+        if epsilon and random.choices([True, False], [self.epsilon, 1 - self.epsilon])[0]:
+            return random.choice(self.available[self.encode(state)])
+
+        return self.best_action(state)
+
+    def best_action(self, state, actions=None):
+        """
+        Given a state, return the available action with the highest Q-value,
+        or a random available action if none has been taken yet.
+        Available actions come from the legal-action mask, `actions` is accepted to match NimAI.
+        """
+
+        row = self.encode(state)
+
+        best = self.q[row].argmax().item()
+
+        if self.q.item(row, best) == -np.inf:
+            return random.choice(self.available[row])
+
+        return self.moves[best]
+
+    def policy(self):
+        """
+        Returns the column of the best action of every state at once, or -1 for states with no action taken yet.
+        """
+
+        best = self.q.argmax(axis=1)
+
+        return np.where(self.q[np.arange(len(best)), best] == -np.inf, -1, best)
+
+    def to_bytes(self):
+        """
+        Returns the Q-table as a single buffer.
+        """
+
+        return self.q.tobytes()
+
+    @classmethod
+    def from_bytes(cls, buffer, initial=None, alpha=0.5, epsilon=0.1):
+        """
+        Returns an AI with the Q-table stored in `buffer` by `to_bytes`, for games starting from piles `initial`.
+        """
+
+        ai = cls(initial, alpha, epsilon)
+
+        ai.q = np.frombuffer(buffer, dtype=ai.q.dtype).reshape(ai.q.shape).copy()
+
+        return ai
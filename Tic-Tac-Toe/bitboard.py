@@ -0,0 +1,245 @@
+"""
+Tic-Tac-Toe on bitboards: a state is a pair of integers (x, o) where bit i * 3 + j is set
+if that player holds cell (i, j). Functions mirror those of tic_tac_toe, on states instead of boards.
+"""
+
+from tic_tac_toe import X, O, EMPTY, EXACT, LOWER, UPPER, SYMMETRIES, INVERSES
+
+SIZE = 3
+
+FULL = (1 << SIZE * SIZE) - 1
+
+
+def lines(height, width, length):
+    """
+    Returns the masks of every row, column and diagonal run of `length` cells on a height by width board.
+    """
+
+    masks = list()
+
+    for i in range(height):
+        for j in range(width):
+            for di, dj in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                end_i = i + di * (length - 1)
+                end_j = j + dj * (length - 1)
+
+                if 0 <= end_i < height and 0 <= end_j < width:
+                    mask = 0
+
+                    for step in range(length):
+                        mask |= 1 << ((i + di * step) * width + j + dj * step)
+
+                    masks.append(mask)
+
+    return masks
+
+
+LINES = lines(SIZE, SIZE, SIZE)
+
+# Every mask of the board under each symmetry, so a state is transformed with two lookups
+PERMUTATIONS = list()
+
+for symmetry in SYMMETRIES:
+    bits = [
+        1 << (i * SIZE + j)
+        for i, j in (symmetry(k // SIZE, k % SIZE, SIZE, SIZE) for k in range(SIZE * SIZE))
+    ]
+
+    table = [0] * (FULL + 1)
+
+    for mask in range(1, FULL + 1):
+        low = mask & -mask
+
+        table[mask] = table[mask ^ low] | bits[low.bit_length() - 1]
+
+    PERMUTATIONS.append(table)
+
+# Search results by canonical state, kept across calls to minimax
+transpositions = dict()
+
+
+def initial_state():
+    """
+    Returns starting state of the board.
+    """
+
+    return 0, 0
+
+
+def from_board(board):
+    """
+    Returns the state of a list-of-lists board.
+    """
+
+    x = o = 0
+
+    for i, row in enumerate(board):
+        for j, cell in enumerate(row):
+            if cell == X:
+                x |= 1 << (i * SIZE + j)
+            elif cell == O:
+                o |= 1 << (i * SIZE + j)
+
+    return x, o
+
+
+def to_board(state):
+    """
+    Returns the list-of-lists board of a state.
+    """
+
+    x, o = state
+
+    return [
+        [X if x >> (i * SIZE + j) & 1 else O if o >> (i * SIZE + j) & 1 else EMPTY for j in range(SIZE)]
+        for i in range(SIZE)
+    ]
+
+
+def player(state):
+    """
+    Returns player who has the next turn in a state.
+    """
+
+    x, o = state
+
+    return X if x.bit_count() == o.bit_count() else O
+
+
+def actions(state):
+    """
+    Returns set of all possible actions (i, j) available in the state.
+    """
+
+    free = FULL & ~(state[0] | state[1])
+
+    return {divmod(k, SIZE) for k in range(SIZE * SIZE) if free >> k & 1}
+
+
+def result(state, action):
+    """
+    Returns the state that results from making move (i, j).
+    """
+
+    i, j = action
+
+    bit = 1 << (i * SIZE + j)
+
+    x, o = state
+
+    if (x | o) & bit:
+        raise Exception('Invalid move. Position is not empty.')
+
+    return (x | bit, o) if x.bit_count() == o.bit_count() else (x, o | bit)
+
+
+def winner(state):
+    """
+    Returns the winner of the game, if there is one.
+    """
+
+    x, o = state
+
+    for line in LINES:
+        if x & line == line:
+            return X
+        elif o & line == line:
+            return O
+
+    return None
+
+
+def terminal(state):
+    """
+    Returns True if game is over, False otherwise.
+    """
+
+    return winner(state) is not None or state[0] | state[1] == FULL
+
+
+def utility(state):
+    """
+    Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
+    """
+
+    win = winner(state)
+
+    return 1 if win == X else -1 if win == O else 0
+
+
+def canonical(state):
+    """
+    Returns the state shared by the state and all its rotations and reflections,
+    together with the symmetry that maps the state onto it.
+    """
+
+    x, o = state
+
+    return min(((table[x], table[o]), k) for k, table in enumerate(PERMUTATIONS))
+
+
+def alphabeta(state, alpha, beta):
+    """
+    Returns the value of the state and the best move in it, searching within (alpha, beta).
+    X maximizes and O minimizes. Results are cached in the transposition table as in tic_tac_toe.
+    """
+
+    if terminal(state):
+        return utility(state), None
+
+    key, symmetry = canonical(state)
+
+    entry = transpositions.get(key)
+
+    if entry is not None:
+        value, bound, move = entry
+
+        if bound == EXACT or (bound == LOWER and value >= beta) or (bound == UPPER and value <= alpha):
+            if move is not None:
+                move = SYMMETRIES[INVERSES[symmetry]](*move, SIZE, SIZE)
+
+            return value, move
+
+    maximizing = player(state) == X
+
+    low, high = alpha, beta
+
+    choice = None
+    value = float('-inf') if maximizing else float('inf')
+
+    for action in actions(state):
+        child = alphabeta(result(state, action), low, high)[0]
+
+        if (child > value) if maximizing else (child < value):
+            value = child
+            choice = action
+
+        if maximizing:
+            low = max(low, value)
+        else:
+            high = min(high, value)
+
+        if low >= high:
+            break
+
+    if value <= alpha:
+        bound = UPPER
+    elif value >= beta:
+        bound = LOWER
+    else:
+        bound = EXACT
+
+    transpositions[key] = (value, bound, None if choice is None else SYMMETRIES[symmetry](*choice, SIZE, SIZE))
+
+    return value, choice
+
+
+def minimax(state):
+    """
+    Returns the optimal action for the current player in the state.
+    """
+
+    if terminal(state):
+        return None
+
+    return alphabeta(state, float('-inf'), float('inf'))[1]
@@ -0,0 +1,148 @@
+"""
+Solve every reachable position of 3x3 Tic-Tac-Toe and write the opening book read by tic_tac_toe.minimax.
+"""
+
+import argparse
+import sys
+
+import tic_tac_toe as ttt
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or check the perfect-play Tic-Tac-Toe opening book.")
+
+    parser.add_argument("--verify", action="store_true", help="check the existing book against a live search")
+
+    args = parser.parse_args()
+
+    if args.verify:
+        book = ttt.opening_book()
+
+        if book is None:
+            sys.exit(f"No book at {ttt.BOOK}.")
+
+        mistakes = verify(book)
+
+        for board, message in mistakes:
+            print(f"{board}: {message}")
+
+        sys.exit(1 if mistakes else 0)
+
+    book = solve()
+
+    with open(ttt.BOOK, "wb") as f:
+        f.write(book)
+
+    print(f"Wrote {sum(entry != ttt.NO_ENTRY for entry in book)} positions to {ttt.BOOK}.")
+
+
+def positions():
+    """
+    Yields every board reachable from the empty board, each once.
+    """
+
+    seen = set()
+    stack = [ttt.initial_state()]
+
+    while stack:
+        board = stack.pop()
+
+        code = ttt.index(board)
+
+        if code in seen:
+            continue
+
+        seen.add(code)
+
+        yield board
+
+        if not ttt.terminal(board):
+            stack.extend(ttt.result(board, action) for action in ttt.actions(board))
+
+
+def solve():
+    """
+    Returns the book: for every reachable position that is not over, the value of the game under
+    perfect play and the first move in row-major order that keeps it, packed as move * 3 + value + 1.
+    """
+
+    book = bytearray([ttt.NO_ENTRY]) * 3 ** 9
+
+    values = dict()
+
+    def value(board):
+        if ttt.terminal(board):
+            return ttt.utility(board)
+
+        code = ttt.index(board)
+
+        if code not in values:
+            best = None
+            choice = None
+
+            maximizing = ttt.player(board) == ttt.X
+
+            for action in sorted(ttt.actions(board)):
+                child = value(ttt.result(board, action))
+
+                if best is None or (child > best if maximizing else child < best):
+                    best = child
+                    choice = action
+
+            values[code] = best
+
+            book[code] = (choice[0] * 3 + choice[1]) * 3 + best + 1
+
+        return values[code]
+
+    value(ttt.initial_state())
+
+    return bytes(book)
+
+
+def verify(book):
+    """
+    Checks every reachable position against a live search, returning the positions the book gets wrong.
+    The stored value must be the value the search finds, and the stored move must keep it.
+    """
+
+    mistakes = list()
+
+    def search(board):
+        if ttt.terminal(board):
+            return ttt.utility(board)
+
+        empty = sum(row.count(ttt.EMPTY) for row in board)
+
+        return ttt.Search(board, budget=float('inf')).alphabeta(empty, float('-inf'), float('inf'), 0)[0]
+
+    for board in positions():
+        entry = book[ttt.index(board)]
+
+        if ttt.terminal(board):
+            if entry != ttt.NO_ENTRY:
+                mistakes.append((board, "entry for a finished game"))
+
+            continue
+
+        if entry == ttt.NO_ENTRY:
+            mistakes.append((board, "missing entry"))
+
+            continue
+
+        move, stored = divmod(entry // 3, 3), entry % 3 - 1
+
+        live = search(board)
+
+        if stored != live:
+            mistakes.append((board, f"value {stored}, search finds {live}"))
+        elif board[move[0]][move[1]] is not ttt.EMPTY:
+            mistakes.append((board, f"move {move} on a taken cell"))
+        elif search(ttt.result(board, move)) != live:
+            mistakes.append((board, f"move {move} gives up the value {live}"))
+
+    return mistakes
+
+
+if __name__ == "__main__":
+    main()
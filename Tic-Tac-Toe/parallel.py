@@ -0,0 +1,244 @@
+"""
+Parallel Tic-Tac-Toe search that splits the moves of the root across a pool of processes,
+and a benchmark comparing it with the serial search.
+"""
+
+import argparse
+import random
+import time
+from collections import ChainMap
+from concurrent.futures import ProcessPoolExecutor, wait
+
+import tic_tac_toe as ttt
+
+# Transposition table of a worker process, kept across the moves it is given
+table = dict()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the serial and root-split parallel Tic-Tac-Toe searches.")
+
+    parser.add_argument("--height", type=int, default=7, help="board height")
+    parser.add_argument("--width", type=int, default=7, help="board width")
+    parser.add_argument("--length", type=int, default=4, help="marks in a row needed to win")
+    parser.add_argument("--depth", type=int, default=4, help="depth both searches deepen to")
+    parser.add_argument("--opening", type=int, default=2, help="random moves played before searching")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes, defaults to one per CPU")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the opening moves")
+
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+
+    board = ttt.initial_state(args.height, args.width)
+
+    for _ in range(args.opening):
+        if not ttt.terminal(board, args.length):
+            board = ttt.result(board, random.choice(sorted(ttt.actions(board))))
+
+    if ttt.terminal(board, args.length):
+        parser.error("the opening moves ended the game")
+
+    # Serial search, from an empty transposition table
+    ttt.transpositions.clear()
+
+    search = ttt.Search(board, args.length, budget=float('inf'))
+
+    start = time.perf_counter()
+
+    for depth in range(1, args.depth + 1):
+        value, move = search.alphabeta(depth, float('-inf'), float('inf'), 0)
+
+    serial = time.perf_counter() - start
+
+    report("serial", search.nodes, serial, value, move)
+
+    # Parallel search, from empty tables, once every worker is up
+    ttt.transpositions.clear()
+
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        list(executor.map(abs, range(64)))
+
+        split = RootSplit(board, args.length, executor, budget=float('inf'))
+
+        start = time.perf_counter()
+
+        for depth in range(1, args.depth + 1):
+            value, move = split.iterate(depth)
+
+        seconds = time.perf_counter() - start
+
+    report("parallel", split.nodes, seconds, value, move)
+
+    print(f"Speedup: {serial / seconds:.2f}x")
+
+
+def report(name, nodes, seconds, value, move):
+    """
+    Prints the node count, speed and result of a search.
+    """
+
+    print(f"{name:>8}: {nodes} nodes in {seconds:.2f}s, {nodes / seconds:.0f} nodes/s, value {value:.3f}, move {move}")
+
+
+def search_move(board, move, length, depth, alpha, beta, deadline):
+    """
+    Searches the board after `move` `depth` - 1 moves further within (alpha, beta), in a worker process,
+    until `deadline` in time.time() seconds, however long the task waited to start.
+    Returns the value, or None if the deadline passed, the nodes searched and the transposition entries it added.
+    """
+
+    child = ttt.result(board, move)
+
+    # New entries go to their own dictionary, on top of what the worker already knows
+    fresh = dict()
+
+    search = ttt.Search(child, length, deadline - time.time(), table=ChainMap(fresh, table))
+
+    try:
+        value = search.alphabeta(depth - 1, alpha, beta, 0, move)[0]
+    except ttt.Timeout:
+        value = None
+
+    table.update(fresh)
+
+    return value, search.nodes, fresh
+
+
+def merge(table, entries):
+    """
+    Adds transposition entries found by a worker to `table`, keeping the deepest of each.
+    """
+
+    for key, entry in entries.items():
+        current = table.get(key)
+
+        if current is None or current[3] <= entry[3]:
+            table[key] = entry
+
+
+class RootSplit:
+    """
+    Search that splits the moves of the root across the processes of `executor`, young brothers wait:
+    the first move is searched here, and its value bounds the window the others are then searched with in parallel.
+    Workers keep their own transposition tables, and their new entries are merged into this process's table.
+    """
+
+    def __init__(self, board, length=3, executor=None, budget=ttt.BUDGET):
+        self.board = board
+        self.length = length
+        self.executor = executor
+
+        # Workers are given the deadline rather than the budget, since tasks may wait before they start
+        self.budget = budget
+        self.deadline = time.time() + budget
+
+        # The first move is searched with a serial search, whose ordering also ranks the root moves
+        self.search = ttt.Search(board, length, budget)
+
+        self.moves = self.search.order(self.search.moves(), 0, None)
+
+        self.worker_nodes = 0
+
+    @property
+    def nodes(self):
+        return self.search.nodes + self.worker_nodes
+
+    def iterate(self, depth):
+        """
+        Searches every root move `depth` moves ahead, returning the value of the board and the best move.
+        Raises tic_tac_toe.Timeout if the budget runs out first.
+        """
+
+        search = self.search
+
+        first = self.moves[0]
+
+        search.play(first, search.turn)
+
+        value = search.alphabeta(depth - 1, float('-inf'), float('inf'), 1, first)[0]
+
+        search.undo(first)
+
+        # Younger brothers only matter if they beat the eldest
+        maximizing = search.turn == ttt.X
+
+        window = (value, float('inf')) if maximizing else (float('-inf'), value)
+
+        futures = [
+            self.executor.submit(search_move, self.board, move, self.length, depth, *window, self.deadline)
+            for move in self.moves[1:]
+        ]
+
+        # Tasks still queued at the deadline are cancelled, and running ones stop on their own
+        timeout = None if self.deadline == float('inf') else max(0, self.deadline - time.time())
+
+        pending = wait(futures, timeout=timeout)[1]
+
+        for future in pending:
+            future.cancel()
+
+        best = first
+        complete = not pending
+
+        for move, future in zip(self.moves[1:], futures):
+            if future in pending:
+                continue
+
+            child, nodes, entries = future.result()
+
+            self.worker_nodes += nodes
+
+            merge(search.table, entries)
+
+            if child is None:
+                complete = False
+            elif (child > value) if maximizing else (child < value):
+                value = child
+                best = move
+
+        if not complete:
+            raise ttt.Timeout
+
+        self.moves.remove(best)
+        self.moves.insert(0, best)
+
+        return value, best
+
+    def run(self):
+        """
+        Deepens the search one move at a time until the budget runs out or the game is solved,
+        returning the best move of the deepest completed iteration.
+        """
+
+        best = self.moves[0]
+
+        empty = sum(row.count(ttt.EMPTY) for row in self.board)
+
+        for depth in range(1, empty + 1):
+            try:
+                value, best = self.iterate(depth)
+            except ttt.Timeout:
+                break
+
+            if abs(value) == 1:
+                break
+
+        return best
+
+
+def parallel_minimax(board, length=3, budget=ttt.BUDGET, workers=None):
+    """
+    Returns the best action found for the current player on the board within `budget` seconds,
+    searching the root moves across `workers` processes.
+    """
+
+    if ttt.terminal(board, length):
+        return None
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return RootSplit(board, length, executor, budget).run()
+
+
+if __name__ == "__main__":
+    main()
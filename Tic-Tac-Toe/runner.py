@@ -1,9 +1,20 @@
 import pygame
 import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 
 import tic_tac_toe as ttt
 
+# Board size and number of marks in a row needed to win
+HEIGHT = 3
+WIDTH = 3
+LENGTH = 3
+
+# Frames drawn per second, and shortest time the computer appears to think, in seconds
+FPS = 30
+THINKING = 0.5
+
 pygame.init()
 
 size = width, height = 600, 400
@@ -15,18 +26,30 @@ white = (255, 255, 255)
 screen = pygame.display.set_mode(size)
 
 medium_font = pygame.font.Font("OpenSans-Regular.ttf", 30)
-move_font = pygame.font.Font("OpenSans-Regular.ttf", 60)
+move_font = pygame.font.Font("OpenSans-Regular.ttf", int(180 / max(HEIGHT, WIDTH)))
 small_font = pygame.font.Font("OpenSans-Regular.ttf", 20)
 
 user = None
 
-board = ttt.initial_state()
+board = ttt.initial_state(HEIGHT, WIDTH)
+
+# The computer searches on a worker thread so the window keeps responding
+executor = ThreadPoolExecutor(max_workers=1)
 
-bot_turn = False
+search = None
+cancel = threading.Event()
+started = None
+
+clock = pygame.time.Clock()
 
 while True:
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
+            # Stop any search in progress so the worker thread does not hold up the exit
+            cancel.set()
+
+            executor.shutdown(wait=False)
+
             sys.exit()
 
     screen.fill(black)
@@ -81,17 +104,17 @@ while True:
                 user = ttt.O
     else:
         # Draw game board
-        tile_size = 80
+        tile_size = int(240 / max(HEIGHT, WIDTH))
 
-        tile_origin = (width / 2 - (1.5 * tile_size),
-                       height / 2 - (1.5 * tile_size))
+        tile_origin = (width / 2 - (WIDTH / 2 * tile_size),
+                       height / 2 - (HEIGHT / 2 * tile_size))
 
         tiles = list()
 
-        for i in range(3):
+        for i in range(HEIGHT):
             row = list()
 
-            for j in range(3):
+            for j in range(WIDTH):
                 rect = pygame.Rect(
                     tile_origin[0] + j * tile_size,
                     tile_origin[1] + i * tile_size,
@@ -112,13 +135,13 @@ while True:
 
             tiles.append(row)
 
-        game_over = ttt.terminal(board)
+        game_over = ttt.terminal(board, LENGTH)
         
         player = ttt.player(board)
 
         # Show title
         if game_over:
-            winner = ttt.winner(board)
+            winner = ttt.winner(board, LENGTH)
 
             if winner is None:
                 title = f"Game Over: Tie!"
@@ -127,7 +150,7 @@ while True:
         elif user == player:
             title = f"Playing as {user}"
         else:
-            title = f"Computer thinking..."
+            title = "Computer thinking" + "." * (1 + int(time.time() * 2) % 3)
 
         title = medium_font.render(title, True, white)
 
@@ -138,16 +161,15 @@ while True:
 
         # Check for AI move
         if user != player and not game_over:
-            if bot_turn:
-                time.sleep(0.5)
+            if search is None:
+                cancel = threading.Event()
+                started = time.time()
 
-                move = ttt.minimax(board)
-                
-                board = ttt.result(board, move)
+                search = executor.submit(ttt.minimax, board, LENGTH, ttt.BUDGET, cancel)
+            elif search.done() and time.time() - started >= THINKING:
+                board = ttt.result(board, search.result())
 
-                bot_turn = False
-            else:
-                bot_turn = True
+                search = None
 
         # Check for a user move
         click, _, _ = pygame.mouse.get_pressed()
@@ -155,8 +177,8 @@ while True:
         if click == 1 and user == player and not game_over:
             x, y = pygame.mouse.get_pos()
 
-            for i in range(3):
-                for j in range(3):
+            for i in range(HEIGHT):
+                for j in range(WIDTH):
                     if board[i][j] == ttt.EMPTY and tiles[i][j].collidepoint(x, y):
                         board = ttt.result(board, (i, j))
 
@@ -182,8 +204,12 @@ while True:
 
                     user = None
 
-                    board = ttt.initial_state()
+                    board = ttt.initial_state(HEIGHT, WIDTH)
 
-                    bot_turn = False
+                    cancel.set()
+
+                    search = None
 
     pygame.display.flip()
+
+    clock.tick(FPS)
@@ -0,0 +1,14 @@
+"""
+Checks the opening book against the live search.
+"""
+
+import tic_tac_toe as ttt
+from book import verify
+
+
+def test_book_matches_search():
+    book = ttt.opening_book()
+
+    assert book is not None, "book.bin is missing, write it with book.py"
+
+    assert verify(book) == []
@@ -0,0 +1,68 @@
+"""
+Checks the state Search keeps up to date move by move against the functions that compute it from scratch.
+"""
+
+import math
+import random
+
+import tic_tac_toe as ttt
+
+
+def check(search, length):
+    """
+    Asserts the score and frontier of `search` match those computed from its board.
+    """
+
+    board = search.board
+
+    assert math.isclose(search.score / (1 + abs(search.score)), ttt.evaluate(board, length), abs_tol=1e-12)
+
+    around = ttt.neighborhoods(search.height, search.width)
+
+    marked = {cell for cell in around if board[cell[0]][cell[1]] is not ttt.EMPTY}
+
+    assert search.frontier == {
+        cell for cell in around if board[cell[0]][cell[1]] is ttt.EMPTY and marked.intersection(around[cell])
+    }
+
+
+def test_incremental_state_matches_board():
+    rng = random.Random(0)
+
+    for height, width, length in [(3, 3, 3), (4, 5, 3), (6, 6, 4), (7, 7, 5)]:
+        for _ in range(20):
+            search = ttt.Search(ttt.initial_state(height, width), length, budget=float('inf'))
+
+            played = list()
+            mark = ttt.X
+
+            for cell in rng.sample(sorted(ttt.actions(search.board)), height * width):
+                search.play(cell, mark)
+                played.append(cell)
+
+                check(search, length)
+
+                # Only the line through the last cell can be new, and no line was complete before it
+                assert search.wins(cell) == (ttt.winner(search.board, length) is not None)
+
+                if search.wins(cell):
+                    break
+
+                mark = ttt.O if mark == ttt.X else ttt.X
+
+            # Taking every move back restores the empty board
+            for cell in reversed(played):
+                search.undo(cell)
+
+                check(search, length)
+
+            assert search.score == 0 and not search.frontier and not search.filled
+
+
+def test_search_from_board_matches_played_moves():
+    board = ttt.initial_state(5, 5)
+
+    for cell, mark in [((2, 2), ttt.X), ((1, 1), ttt.O), ((2, 3), ttt.X), ((4, 0), ttt.O)]:
+        board[cell[0]][cell[1]] = mark
+
+    check(ttt.Search(board, 4, budget=float('inf')), 4)
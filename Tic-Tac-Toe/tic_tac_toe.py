@@ -2,23 +2,55 @@
 Tic-Tac-Toe
 """
 
+import os
+import time
 from copy import deepcopy
+from functools import lru_cache
 
 X = 'X'
 O = 'O'
 EMPTY = None
 
+# Seconds a search may take before it settles for the deepest iteration it completed
+BUDGET = 1.0
 
-def initial_state():
+# Only empty cells within this many rows and columns of a mark are searched, which covers any 3x3 board
+RADIUS = 2
+
+# Kinds of value stored in the transposition table: exact, or a bound from an alpha-beta cutoff
+EXACT, LOWER, UPPER = range(3)
+
+# Rotations and reflections of a height by width board as maps of cell (i, j), and the index of the inverse of each.
+# Quarter turns and diagonal reflections only apply to square boards.
+SYMMETRIES = [
+    lambda i, j, height, width: (i, j),
+    lambda i, j, height, width: (j, height - 1 - i),
+    lambda i, j, height, width: (height - 1 - i, width - 1 - j),
+    lambda i, j, height, width: (width - 1 - j, i),
+    lambda i, j, height, width: (i, width - 1 - j),
+    lambda i, j, height, width: (j, i),
+    lambda i, j, height, width: (height - 1 - i, j),
+    lambda i, j, height, width: (width - 1 - j, height - 1 - i)
+]
+
+INVERSES = [0, 3, 2, 1, 4, 5, 6, 7]
+
+# Search results by board size, win length and canonical board, kept across calls to minimax
+transpositions = dict()
+
+# Perfect-play table of every 3x3 position, written by book.py
+BOOK = os.path.join(os.path.dirname(os.path.abspath(__file__)), "book.bin")
+
+# Book entry of positions that are terminal or unreachable
+NO_ENTRY = 255
+
+
+def initial_state(height=3, width=3):
     """
     Returns starting state of the board.
     """
 
-    return [
-        [EMPTY, EMPTY, EMPTY],
-        [EMPTY, EMPTY, EMPTY],
-        [EMPTY, EMPTY, EMPTY]
-    ]
+    return [[EMPTY] * width for _ in range(height)]
 
 
 def player(board):
@@ -64,139 +96,462 @@ def result(board, action):
     return new
 
 
-def winner_by_array(board):
+@lru_cache(maxsize=None)
+def lines(height, width, length):
     """
-    Returns the winner, if any, of the game based on the rows and columns of the board.
+    Returns every row, column and diagonal run of `length` cells on a height by width board, as lists of cells.
     """
 
-    for i in board:
-        if i.count(X) == len(i):
-            return X
-        elif i.count(O) == len(i):
-            return O
+    runs = list()
+
+    for i in range(height):
+        for j in range(width):
+            for di, dj in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                if 0 <= i + di * (length - 1) < height and 0 <= j + dj * (length - 1) < width:
+                    runs.append([(i + di * step, j + dj * step) for step in range(length)])
+
+    return runs
+
+
+def winner(board, length=3):
+    """
+    Returns the winner of the game, if there is one: the player holding `length` cells in a row.
+    """
+
+    for line in lines(len(board), len(board[0]), length):
+        i, j = line[0]
+
+        first = board[i][j]
 
-    for i in zip(*deepcopy(board)):
-        if i.count(X) == len(i):
-            return X
-        elif i.count(O) == len(i):
-            return O
+        if first is not EMPTY and all(board[a][b] == first for a, b in line[1:]):
+            return first
 
     return None
 
 
-def winner_by_diagonal(board):
+def terminal(board, length=3):
     """
-    Returns the winner, if any, of the game based on both diagonals of the board.
+    Returns True if game is over, False otherwise.
     """
 
-    diagonal = {
-        X: 0,
-        O: 0,
-        EMPTY: 0
-    }
+    return winner(board, length) is not None or all(cell is not EMPTY for row in board for cell in row)
 
-    anti = deepcopy(diagonal)
 
-    for i in range(len(board)):
-        diagonal[board[i][i]] += 1
-        anti[board[i][-i - 1]] += 1
+def utility(board, length=3):
+    """
+    Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
+    """
 
-    if diagonal[X] == len(board) or anti[X] == len(board):
-        return X
-    elif diagonal[O] == len(board) or anti[O] == len(board):
-        return O
+    win = winner(board, length)
 
-    return None
+    return 1 if win == X else -1 if win == O else 0
 
 
-def winner(board):
+def weight(x, o):
     """
-    Returns the winner of the game, if there is one.
+    Returns what a line holding `x` marks of X and `o` marks of O adds to the heuristic score.
     """
 
-    array = winner_by_array(board)
-    diagonal = winner_by_diagonal(board)
+    if x and not o:
+        return 4 ** x
+    elif o and not x:
+        return -4 ** o
 
-    for i in {array, diagonal}:
-        if i:
-            return i
+    return 0
 
-    return None
+
+def evaluate(board, length=3):
+    """
+    Returns a heuristic value of the board strictly between -1 and 1, positive when it favors X.
+    Every line still open to a single player counts for that player, the more so the more of it they hold.
+    """
+
+    score = 0
+
+    for line in lines(len(board), len(board[0]), length):
+        marks = [board[i][j] for i, j in line]
+
+        score += weight(marks.count(X), marks.count(O))
+
+    return score / (1 + abs(score))
 
 
-def terminal(board):
+@lru_cache(maxsize=None)
+def orders(height, width):
     """
-    Returns True if game is over, False otherwise.
+    Returns, for every symmetry of a height by width board, its index
+    and the cells of the board in the order they land on it row by row.
     """
 
-    return winner(board) or all(sum(board, list()))
+    symmetries = range(len(SYMMETRIES)) if height == width else (0, 2, 4, 6)
 
+    return [
+        (k, [SYMMETRIES[INVERSES[k]](i, j, height, width) for i in range(height) for j in range(width)])
+        for k in symmetries
+    ]
 
-def utility(board):
+
+def canonical(board):
     """
-    Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
+    Returns the key shared by the board and all its rotations and reflections,
+    together with the symmetry that maps the board onto that key.
     """
 
-    win = winner(board)
+    return min(
+        (tuple(board[i][j] or '' for i, j in order), k)
+        for k, order in orders(len(board), len(board[0]))
+    )
 
-    return 1 if win == X else -1 if win == O else 0
 
+@lru_cache(maxsize=None)
+def crossing(height, width, length):
+    """
+    Returns the indices, in `lines`, of the winning lines through each cell of a height by width board.
+    """
+
+    through = {(i, j): list() for i in range(height) for j in range(width)}
+
+    for k, line in enumerate(lines(height, width, length)):
+        for cell in line:
+            through[cell].append(k)
+
+    return through
+
+
+@lru_cache(maxsize=None)
+def neighborhoods(height, width):
+    """
+    Returns the cells within RADIUS rows and columns of each cell of a height by width board, itself excluded.
+    """
+
+    return {
+        (i, j): [
+            (a, b)
+            for a in range(max(i - RADIUS, 0), min(i + RADIUS + 1, height))
+            for b in range(max(j - RADIUS, 0), min(j + RADIUS + 1, width))
+            if (a, b) != (i, j)
+        ]
+        for i in range(height)
+        for j in range(width)
+    }
+
+
+class Timeout(Exception):
+    """
+    Raised inside a search when its time budget runs out or it is cancelled.
+    The board of the search is left in the middle of a move, so the search must be discarded.
+    """
+
+
+class Search:
+    """
+    Iterative deepening alpha-beta search from one board, within a wall-clock budget.
+    Moves are tried in order: the best move stored in the transposition table first,
+    then the killer moves that caused cutoffs at the same ply, then by history score.
+    """
+
+    def __init__(self, board, length=3, budget=BUDGET, cancel=None, table=None):
+        self.board = deepcopy(board)
+
+        self.height = len(board)
+        self.width = len(board[0])
+        self.length = length
+
+        self.turn = player(board)
+        self.deadline = time.perf_counter() + budget
+
+        # Event another thread may set to stop the search early
+        self.cancel = cancel
+
+        # Results by canonical board, the module's table unless another mapping is given
+        self.table = transpositions if table is None else table
+
+        # Lines through each cell, and cells within RADIUS of each cell
+        self.crossing = crossing(self.height, self.width, length)
+        self.around = neighborhoods(self.height, self.width)
+
+        # Marks of each player on every line, and the heuristic score they add up to
+        count = len(lines(self.height, self.width, length))
+
+        self.counts = {X: [0] * count, O: [0] * count}
+        self.score = 0
+
+        # Marks within RADIUS of each cell, and the empty cells with at least one such mark
+        self.near = dict.fromkeys(self.around, 0)
+        self.frontier = set()
+        self.filled = 0
+
+        marks = [(i, j) for i, row in enumerate(board) for j, cell in enumerate(row) if cell is not EMPTY]
+
+        for i, j in marks:
+            self.board[i][j] = EMPTY
+
+            self.play((i, j), board[i][j])
 
-def max_value(board, alpha, beta):
-    if terminal(board):
-        return utility(board), None
+        # Up to two moves per ply that caused a cutoff, and the cutoffs credited to each move
+        self.killers = dict()
+        self.history = dict()
 
-    choice = None
-    value = float('-inf')
+        self.nodes = 0
 
-    for action in actions(board):
-        minimum = min_value(result(board, action), alpha, beta)[0]
+    def play(self, cell, mark):
+        """
+        Puts `mark` on an empty cell, updating the line counts and the cells worth searching.
+        """
 
-        if minimum > value:
-            value = minimum
-            choice = action
+        i, j = cell
 
-        alpha = max(alpha, value)
+        self.board[i][j] = mark
+        self.filled += 1
 
-        if alpha >= beta:
-            break
+        xs, os = self.counts[X], self.counts[O]
 
-    return value, choice
+        for k in self.crossing[cell]:
+            self.score -= weight(xs[k], os[k])
 
+            self.counts[mark][k] += 1
 
-def min_value(board, alpha, beta):
-    if terminal(board):
-        return utility(board), None
+            self.score += weight(xs[k], os[k])
 
-    choice = None
-    value = float('inf')
+        self.frontier.discard(cell)
 
-    for action in actions(board):
-        maximum = max_value(result(board, action), alpha, beta)[0]
+        for a, b in self.around[cell]:
+            self.near[(a, b)] += 1
 
-        if maximum < value:
-            value = maximum
-            choice = action
+            if self.board[a][b] is EMPTY:
+                self.frontier.add((a, b))
 
-        beta = min(beta, value)
+    def undo(self, cell):
+        """
+        Takes back the mark on a cell, the last one played.
+        """
 
-        if beta <= alpha:
-            break
+        i, j = cell
 
-    return value, choice
+        mark = self.board[i][j]
 
+        self.board[i][j] = EMPTY
+        self.filled -= 1
 
-def minimax(board):
+        xs, os = self.counts[X], self.counts[O]
+
+        for k in self.crossing[cell]:
+            self.score -= weight(xs[k], os[k])
+
+            self.counts[mark][k] -= 1
+
+            self.score += weight(xs[k], os[k])
+
+        for neighbor in self.around[cell]:
+            self.near[neighbor] -= 1
+
+            if not self.near[neighbor]:
+                self.frontier.discard(neighbor)
+
+        if self.near[cell]:
+            self.frontier.add(cell)
+
+    def moves(self):
+        """
+        Returns the empty cells within RADIUS of a mark, or the center of an empty board.
+        If no empty cell lies near a mark, every empty cell is returned, so moves run out only on a full board.
+        """
+
+        if self.frontier:
+            return self.frontier
+
+        if not self.filled:
+            return {(self.height // 2, self.width // 2)}
+
+        return {(i, j) for i, row in enumerate(self.board) for j, cell in enumerate(row) if cell is EMPTY}
+
+    def wins(self, cell):
+        """
+        Checks if the mark on `cell` completes a line, looking only at the lines through it.
+        """
+
+        i, j = cell
+
+        counts = self.counts[self.board[i][j]]
+
+        return any(counts[k] == self.length for k in self.crossing[cell])
+
+    def order(self, moves, ply, hint):
+        """
+        Sorts moves with `hint` first, then the killer moves of `ply`, then by decreasing history score.
+        """
+
+        killers = self.killers.get(ply, ())
+
+        return sorted(moves, key=lambda move: (move != hint, move not in killers, -self.history.get(move, 0)))
+
+    def alphabeta(self, depth, alpha, beta, ply, last=None):
+        """
+        Returns the value of the board searched `depth` moves ahead within (alpha, beta), and the best move.
+        X maximizes and O minimizes. Boards at the depth limit get their heuristic value.
+        `last` is the cell played to reach the board: only a line through it can have just been completed.
+        """
+
+        self.nodes += 1
+
+        if time.perf_counter() > self.deadline or (self.cancel is not None and self.cancel.is_set()):
+            raise Timeout
+
+        board = self.board
+
+        if last is not None and self.wins(last):
+            return (1 if board[last[0]][last[1]] == X else -1), None
+
+        moves = self.moves()
+
+        if not moves:
+            return 0, None
+
+        if depth == 0:
+            return self.score / (1 + abs(self.score)), None
+
+        key, symmetry = canonical(board)
+
+        key = (self.height, self.width, self.length, key)
+
+        hint = None
+
+        entry = self.table.get(key)
+
+        # Stored bounds only cut the search off: narrowing the window with them
+        # would make the move of a search that fails low unreliable
+        if entry is not None:
+            value, bound, move, searched = entry
+
+            if move is not None:
+                move = SYMMETRIES[INVERSES[symmetry]](*move, self.height, self.width)
+
+            if searched >= depth and (
+                bound == EXACT or (bound == LOWER and value >= beta) or (bound == UPPER and value <= alpha)
+            ):
+                return value, move
+
+            hint = move
+
+        mark = self.turn if ply % 2 == 0 else (O if self.turn == X else X)
+
+        maximizing = mark == X
+
+        low, high = alpha, beta
+
+        choice = None
+        value = float('-inf') if maximizing else float('inf')
+
+        for move in self.order(moves, ply, hint):
+            self.play(move, mark)
+
+            child = self.alphabeta(depth - 1, low, high, ply + 1, move)[0]
+
+            self.undo(move)
+
+            if (child > value) if maximizing else (child < value):
+                value = child
+                choice = move
+
+            if maximizing:
+                low = max(low, value)
+            else:
+                high = min(high, value)
+
+            if low >= high:
+                killers = self.killers.setdefault(ply, list())
+
+                if move not in killers:
+                    killers.insert(0, move)
+
+                    del killers[2:]
+
+                self.history[move] = self.history.get(move, 0) + depth * depth
+
+                break
+
+        if value <= alpha:
+            bound = UPPER
+        elif value >= beta:
+            bound = LOWER
+        else:
+            bound = EXACT
+
+        stored = None if choice is None else SYMMETRIES[symmetry](*choice, self.height, self.width)
+
+        self.table[key] = (value, bound, stored, depth)
+
+        return value, choice
+
+    def run(self):
+        """
+        Deepens the search one move at a time until the budget runs out, the search is cancelled
+        or the game is solved, returning the best move of the deepest completed iteration.
+        """
+
+        # Fall back to the first move in order if not even one iteration completes
+        best = self.order(self.moves(), 0, None)[0]
+
+        empty = sum(row.count(EMPTY) for row in self.board)
+
+        for depth in range(1, empty + 1):
+            try:
+                value, move = self.alphabeta(depth, float('-inf'), float('inf'), 0)
+            except Timeout:
+                break
+
+            if move is not None:
+                best = move
+
+            # Only finished games are worth 1 or -1, so deeper searches cannot change a proven result
+            if abs(value) == 1:
+                break
+
+        return best
+
+
+def index(board):
+    """
+    Returns the position of a 3x3 board in the book: cell i * 3 + j counts 3 ** (i * 3 + j) times 0, 1 or 2
+    when it is empty, holds X or holds O.
+    """
+
+    code = 0
+
+    for cell in reversed(sum(board, list())):
+        code = code * 3 + (1 if cell == X else 2 if cell == O else 0)
+
+    return code
+
+
+@lru_cache(maxsize=None)
+def opening_book():
     """
-    Returns the optimal action for the current player on the board.
+    Returns the book, one byte per position holding move * 3 + value + 1, or None if it has not been written.
     """
 
-    if terminal(board):
+    try:
+        with open(BOOK, "rb") as f:
+            return f.read()
+    except FileNotFoundError:
         return None
 
-    next_ = player(board)
 
-    if next_ == X:
-        return max_value(board, float('-inf'), float('inf'))[1]
-    elif next_ == O:
-        return min_value(board, float('-inf'), float('inf'))[1]
+def minimax(board, length=3, budget=BUDGET, cancel=None):
+    """
+    Returns the best action found for the current player on the board within `budget` seconds,
+    or by the time the threading.Event `cancel` is set.
+    On boards small enough to search to the end, such as 3x3, it is the optimal action.
+    The standard game is answered from the opening book when it is available.
+    """
+
+    if terminal(board, length):
+        return None
+
+    if len(board) == 3 and len(board[0]) == 3 and length == 3:
+        book = opening_book()
+
+        if book is not None and book[index(board)] != NO_ENTRY:
+            return divmod(book[index(board)] // 3, 3)
+
+    return Search(board, length, budget, cancel).run()